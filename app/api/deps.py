@@ -1,5 +1,18 @@
 # backend/app/api/deps.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from fastapi import Request, Response
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+COMPRESSION_MIN_SIZE = 1024
 
 def create_api_response(
     success: bool,
@@ -19,4 +32,128 @@ def create_api_response(
     if message is not None:
         response["message"] = message
     
-    return response
\ No newline at end of file
+    return response
+
+@dataclass(frozen=True)
+class EncodedResponse:
+    """A fully encoded JSON response body together with its strong ETag.
+    
+    ``variants`` holds precompressed bodies keyed by content-coding, in
+    order of preference.
+    """
+    body: bytes
+    etag: str
+    variants: Tuple[Tuple[str, bytes], ...] = ()
+    
+    @property
+    def codings(self) -> Tuple[str, ...]:
+        return tuple(coding for coding, _ in self.variants)
+    
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes, str]:
+        """Pick the best representation for an Accept-Encoding header.
+        
+        Returns the content-coding (None for identity), the body and the
+        representation's ETag.
+        """
+        coding = negotiate_encoding(accept_encoding, self.codings)
+        if coding is None:
+            return None, self.body, self.etag
+        return coding, dict(self.variants)[coding], variant_etag(self.etag, coding)
+
+def variant_etag(etag: str, coding: str) -> str:
+    """Strong ETag of a content-coded representation"""
+    return f'{etag[:-1]}-{coding}"'
+
+def negotiate_encoding(accept_encoding: Optional[str], codings: Sequence[str]) -> Optional[str]:
+    """Pick the accepted content-coding with the highest q-value (None for identity).
+    
+    Ties go to the earlier entry in ``codings``.
+    """
+    if not codings or not accept_encoding:
+        return None
+    
+    accepted = parse_accept_encoding(accept_encoding)
+    best = None
+    best_q = 0.0
+    for coding in codings:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into a coding -> q-value map"""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def compress_body(body: bytes) -> Tuple[Tuple[str, bytes], ...]:
+    """Build the precompressed variants of a response body"""
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return ()
+    
+    variants: List[Tuple[str, bytes]] = []
+    if brotli is not None:
+        variants.append(("br", brotli.compress(body, quality=11)))
+    variants.append(("gzip", gzip.compress(body, compresslevel=9, mtime=0)))
+    return tuple(variants)
+
+def encode_api_response(data: Any, precompress: bool = True) -> EncodedResponse:
+    """Encode (and compress) a successful API response once so it can be served repeatedly.
+    
+    The compressed variants are built at maximum effort, which takes a good
+    fraction of a second for a large body; code running on the event loop
+    passes ``precompress=False`` and serves the identity body.
+    """
+    # Same encoding as starlette's JSONResponse
+    body = json.dumps(
+        create_api_response(success=True, data=data),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return EncodedResponse(body=body, etag=etag, variants=compress_body(body) if precompress else ())
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def cached_json_response(request: Request, encoded: EncodedResponse) -> Response:
+    """Serve a pre-encoded response in the best accepted encoding, answering
+    conditional requests with 304"""
+    coding, body, etag = encoded.select(request.headers.get("accept-encoding"))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if encoded.codings:
+        headers["Vary"] = "Accept-Encoding"
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type="application/json", headers=headers)
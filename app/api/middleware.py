@@ -0,0 +1,112 @@
+# backend/app/api/middleware.py
+import asyncio
+import hmac
+import logging
+import random
+import sys
+import time
+from typing import Optional
+from app.services.metrics import registry
+from app.services.profiler import RequestProfiler
+
+logger = logging.getLogger(__name__)
+
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status", ["method", "route", "status"]
+)
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "Time to handle HTTP requests", ["method", "route"]
+)
+IN_PROGRESS = registry.gauge("http_requests_in_progress", "HTTP requests being handled", ["method"])
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request by its route template.
+    
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so responses
+    are streamed through untouched. Paths that match no route share the
+    ``unmatched`` label to keep the number of series bounded.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status = "500"
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+        
+        IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_PROGRESS.dec(method)
+            # The router records the matched route in the scope
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            REQUESTS.inc(method, route, status)
+            REQUEST_SECONDS.observe(elapsed, method, route)
+
+class ProfilingMiddleware:
+    """Profiles a random ``sample_rate`` of requests and any request whose
+    ``X-Debug-Profile`` header carries ``debug_token``.
+    
+    Profiles are written by ``profiler`` once the response has been sent;
+    requests triggered by the header get the profile id, which prefixes
+    the file name, back in ``X-Profile``. Only add this middleware when
+    profiling is enabled.
+    """
+    
+    HEADER = b"x-debug-profile"
+    
+    def __init__(self, app, profiler: RequestProfiler, sample_rate: float = 0.0, debug_token: Optional[str] = None):
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.debug_token = debug_token.encode() if debug_token else None
+    
+    def _requested(self, scope) -> bool:
+        if self.debug_token is None:
+            return False
+        for name, value in scope["headers"]:
+            if name == self.HEADER:
+                return hmac.compare_digest(value, self.debug_token)
+        return False
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        requested = self._requested(scope)
+        if not requested and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+        
+        profile = self.profiler.begin(sys._getframe())
+        
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile", profile.id.encode())]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_profile_id if requested else send)
+        finally:
+            elapsed = self.profiler.end(profile)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            try:
+                path = await asyncio.to_thread(self.profiler.write, profile, scope["method"], route, elapsed)
+                logger.info(f"Profiled {scope['method']} {route} in {elapsed * 1000:.1f}ms: {path}")
+            except Exception as e:
+                logger.error(f"Failed to write request profile: {e}")
@@ -1,14 +1,17 @@
 # backend/app/api/v1/endpoints/health.py
 from fastapi import APIRouter
-from app.services.hubspot import hubspot_service
+from app.services.hubspot import get_hubspot_service
 
 router = APIRouter()
 
 @router.get("")
 async def health_check():
     """Health check endpoint"""
+    hubspot_service = get_hubspot_service()
     return {
         "status": "healthy",
         "service": "backend-api",
-        "hubspot": "connected" if hubspot_service.client else "disconnected"
+        "hubspot": "connected" if hubspot_service.is_configured else "disconnected",
+        # Local state only; checking it never calls HubSpot
+        "hubspotCircuit": hubspot_service.circuit_state or "disabled"
     }
\ No newline at end of file
@@ -1,18 +1,45 @@
 # backend/app/api/v1/endpoints/learning.py
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Request, status
+from typing import List, Dict, Optional, Union
 from pathlib import Path
-from app.schemas.learning import Module, LearningAreaInfo
-from app.models.learning import LearningContent
-from app.api.deps import create_api_response
+from app.schemas.learning import (
+    Module, LearningAreaInfo, ModuleView, Progress, ProgressUpdate, QuizBatchSubmission, QuizSubmission
+)
+from app.models.learning import AreaSnapshot, LearningContent, summarize_module
+from app.api.deps import create_api_response, encode_api_response, cached_json_response
+from app.services.learning_content import ContentResponseCache
+from app.services.search import SearchIndex
+from app.services.progress import ProgressWriter
+from app.services.analytics import area_analytics
+from app.services.grading import grade_quiz
+from app.db.progress import ProgressStore
 from app.core.config import settings
+import asyncio
+import functools
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize learning content
-learning_content = LearningContent(settings.CONTENT_BASE_PATH)
+content_responses = ContentResponseCache()
+search_index = SearchIndex()
+
+# Created on first use, normally by the app's lifespan, so importing the
+# endpoints touches neither the content directory nor the progress database
+@functools.lru_cache(maxsize=None)
+def get_learning_content() -> LearningContent:
+    return LearningContent(
+        settings.CONTENT_BASE_PATH,
+        settings.CONTENT_BUNDLE_PATH,
+        hide_answers=settings.QUIZ_HIDE_ANSWERS
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_progress_writer() -> ProgressWriter:
+    return ProgressWriter(
+        ProgressStore(settings.PROGRESS_DB_PATH),
+        interval=settings.PROGRESS_FLUSH_INTERVAL
+    )
 
 # Learning area metadata
 LEARNING_AREAS = {
@@ -83,9 +110,37 @@ async def get_learning_areas():
             detail="Failed to fetch learning areas"
         )
 
+@router.get("/search", response_model=Dict)
+async def search_lessons(q: str, area: Optional[str] = None, limit: int = 10):
+    """Full-text search over lesson titles, content and code examples"""
+    try:
+        if area is not None and area not in LEARNING_AREAS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Learning area '{area}' not found"
+            )
+        
+        results = search_index.search(q, area=area, limit=max(1, min(limit, 50)))
+        return create_api_response(
+            success=True,
+            data=results
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching lessons for '{q}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search lessons"
+        )
+
 @router.get("/{area}/modules", response_model=Dict)
-async def get_modules(area: str):
-    """Get all modules for a specific learning area"""
+async def get_modules(area: str, request: Request, view: ModuleView = ModuleView.full):
+    """Get all modules for a specific learning area.
+    
+    ``view=summary`` returns module and lesson metadata without lesson bodies.
+    """
     try:
         if area not in LEARNING_AREAS:
             raise HTTPException(
@@ -93,17 +148,17 @@ async def get_modules(area: str):
                 detail=f"Learning area '{area}' not found"
             )
         
-        modules = learning_content.get_modules_for_area(area)
+        snapshot = await get_learning_content().get_snapshot_async(area)
         
         # If no modules found, return mock data for demo
-        if not modules:
+        if serves_mock_modules(snapshot):
             modules = get_mock_modules(area)
+            if view == ModuleView.summary:
+                modules = [summarize_module(module) for module in modules]
+            return cached_json_response(request, encode_api_response(modules, precompress=False))
         
-        return create_api_response(
-            success=True,
-            data=modules
-        )
-        
+        return cached_json_response(request, content_responses.area_response(snapshot, view))
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -114,7 +169,7 @@ async def get_modules(area: str):
         )
 
 @router.get("/{area}/modules/{module_id}", response_model=Dict)
-async def get_module_content(area: str, module_id: str):
+async def get_module_content(area: str, module_id: str, request: Request):
     """Get content for a specific module"""
     try:
         if area not in LEARNING_AREAS:
@@ -123,46 +178,151 @@ async def get_module_content(area: str, module_id: str):
                 detail=f"Learning area '{area}' not found"
             )
         
-        module = learning_content.get_module_by_id(area, module_id)
+        snapshot = await get_learning_content().get_snapshot_async(area)
+        if snapshot and module_id in snapshot.module_index:
+            return cached_json_response(request, content_responses.module_response(snapshot, module_id))
         
         # If module not found, try mock data
+        module = None
+        modules = get_mock_modules(area)
+        for m in modules:
+            if m['id'] == module_id:
+                module = m
+                break
+        
         if not module:
-            modules = get_mock_modules(area)
-            for m in modules:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Module '{module_id}' not found"
+            )
+        
+        return cached_json_response(request, encode_api_response(module, precompress=False))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching module {module_id} for {area}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch module content"
+        )
+
+@router.get("/{area}/modules/{module_id}/lessons/{lesson_id}", response_model=Dict)
+async def get_lesson_content(area: str, module_id: str, lesson_id: str, request: Request):
+    """Get content for a single lesson of a module"""
+    try:
+        if area not in LEARNING_AREAS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Learning area '{area}' not found"
+            )
+        
+        snapshot = await get_learning_content().get_snapshot_async(area)
+        if snapshot and snapshot.lesson_modules.get(lesson_id) == module_id:
+            return cached_json_response(request, content_responses.lesson_response(snapshot, lesson_id))
+        
+        # If lesson not found, try mock data
+        lesson = None
+        if not snapshot or module_id not in snapshot.module_index:
+            for m in get_mock_modules(area):
                 if m['id'] == module_id:
-                    module = m
+                    lesson = next((l for l in m['lessons'] if l['id'] == lesson_id), None)
                     break
         
-        if not module:
+        if not lesson:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Module '{module_id}' not found"
+                detail=f"Lesson '{lesson_id}' not found in module '{module_id}'"
+            )
+        
+        return cached_json_response(request, encode_api_response(lesson, precompress=False))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching lesson {lesson_id} of {module_id} for {area}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch lesson content"
+        )
+
+@router.post("/{area}/quizzes/grade", response_model=Dict)
+async def grade_quizzes(area: str, submission: Union[QuizSubmission, QuizBatchSubmission]):
+    """Grade one quiz submission, or ``{"submissions": [...]}`` in a single request.
+    
+    A batch returns one result per submission, in order; a submission for
+    a module without a quiz gets an ``error`` instead of failing the batch.
+    Scores of submissions with a ``userId`` and at least one answer are
+    recorded in their progress. While quiz answers are hidden, a result
+    only includes the answer key once the quiz is passed.
+    """
+    try:
+        if area not in LEARNING_AREAS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Learning area '{area}' not found"
+            )
+        
+        snapshot = await get_learning_content().get_snapshot_async(area)
+        answer_keys = snapshot.answer_keys if snapshot else {}
+        batch = isinstance(submission, QuizBatchSubmission)
+        results = []
+        for item in submission.submissions if batch else [submission]:
+            answer_key = answer_keys.get(item.moduleId)
+            if answer_key is None:
+                if not batch:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Module '{item.moduleId}' has no quiz"
+                    )
+                results.append({"moduleId": item.moduleId, "error": "Module has no quiz"})
+                continue
+            
+            result = grade_quiz(
+                item.moduleId, answer_key, item.answers, reveal_answers=not settings.QUIZ_HIDE_ANSWERS
             )
+            # An empty submission is not an attempt
+            if item.userId and result["answered"]:
+                get_progress_writer().record(ProgressUpdate(
+                    userId=item.userId,
+                    learningArea=area,
+                    moduleId=item.moduleId,
+                    quizScore=result["score"]
+                ))
+            results.append(result)
         
         return create_api_response(
             success=True,
-            data=module
+            data=results if batch else results[0]
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching module {module_id} for {area}: {e}")
+        logger.error(f"Error grading quizzes for {area}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch module content"
+            detail="Failed to grade quizzes"
         )
 
 @router.post("/progress/update", response_model=Dict)
-async def update_progress(data: Dict[str, str]):
+async def update_progress(data: ProgressUpdate):
     """Update user's learning progress"""
     try:
-        # In a real application, this would update the user's progress in a database
-        # For now, we'll just return success
+        if data.learningArea not in LEARNING_AREAS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Learning area '{data.learningArea}' not found"
+            )
+        
+        # Buffered and written together with other updates shortly after
+        get_progress_writer().record(data)
         return create_api_response(
             success=True,
             message="Progress updated successfully"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating progress: {e}")
         raise HTTPException(
@@ -170,6 +330,60 @@ async def update_progress(data: Dict[str, str]):
             detail="Failed to update progress"
         )
 
+@router.get("/progress/{user_id}", response_model=Dict)
+async def get_progress(user_id: str, area: Optional[str] = None):
+    """Get a user's learning progress, for every area or just ``area``"""
+    try:
+        progress = await get_progress_writer().get(user_id, area)
+        return create_api_response(
+            success=True,
+            data=[
+                Progress(userId=user_id, learningArea=learning_area, **record).model_dump(mode="json")
+                for learning_area, record in sorted(progress.items())
+            ]
+        )
+    except Exception as e:
+        logger.error(f"Error fetching progress: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch progress"
+        )
+
+@router.get("/analytics/{area}", response_model=Dict)
+async def get_area_analytics(area: str):
+    """Starts, completions, quiz scores and drop-off per module of a learning area"""
+    try:
+        if area not in LEARNING_AREAS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Learning area '{area}' not found"
+            )
+        
+        # Report on the same modules /{area}/modules serves
+        snapshot = await get_learning_content().get_snapshot_async(area)
+        if serves_mock_modules(snapshot):
+            modules = [summarize_module(module) for module in get_mock_modules(area)]
+        else:
+            modules = snapshot.summaries
+        counters = await asyncio.to_thread(get_progress_writer().store.counters, area)
+        return create_api_response(
+            success=True,
+            data=area_analytics(area, modules, counters.get(area, {}))
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching analytics for {area}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch analytics"
+        )
+
+def serves_mock_modules(snapshot: Optional[AreaSnapshot]) -> bool:
+    """Whether an area is served the demo modules because none are loaded for it"""
+    return not snapshot or not snapshot.modules
+
 def get_mock_modules(area: str) -> List[Dict]:
     """Generate mock modules for demo purposes"""
     base_modules = {
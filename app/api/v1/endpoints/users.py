@@ -1,22 +1,71 @@
 # backend/app/api/v1/endpoints/users.py
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
+from app.core.config import settings
+from app.db.idempotency import IdempotencyStore
 from app.schemas.user import UserRegistration, UserResponse
 from app.models.user import User
-from app.services.hubspot import hubspot_service
+from app.services.email_cache import normalize_email
+from app.services.hubspot import get_hubspot_service
+from app.services.idempotency import request_fingerprint, run_idempotent
+from app.services.single_flight import SingleFlight
 from app.api.deps import create_api_response
+import functools
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Concurrent registrations for the same email share one lookup-and-create
+registrations = SingleFlight()
+
+@functools.lru_cache(maxsize=None)
+def get_idempotency_store() -> IdempotencyStore:
+    """The shared store, opened on first use (the app's lifespan opens it at startup)"""
+    return IdempotencyStore(settings.IDEMPOTENCY_PATH, ttl=settings.IDEMPOTENCY_TTL)
+
 @router.post("/register", response_model=Dict)
-async def register_user(user_data: UserRegistration):
-    """Register a new user and store in HubSpot"""
+async def register_user(
+    user_data: UserRegistration,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Register a new user and store in HubSpot.
+    
+    Retries sent with the same ``Idempotency-Key`` header get the original
+    response, whichever worker handles them.
+    """
+    email = normalize_email(user_data.email)
+    
+    async def register_once() -> Tuple[int, Any]:
+        return await registrations.do(email, lambda: _registration_outcome(user_data))
+    
+    if idempotency_key:
+        status_code, body = await run_idempotent(
+            get_idempotency_store(),
+            idempotency_key,
+            request_fingerprint(user_data.model_dump()),
+            register_once,
+            wait=settings.IDEMPOTENCY_WAIT
+        )
+    else:
+        status_code, body = await register_once()
+    return JSONResponse(body, status_code=status_code)
+
+async def _registration_outcome(user_data: UserRegistration) -> Tuple[int, Any]:
+    """Status code and JSON body of a registration, errors included"""
+    try:
+        return status.HTTP_200_OK, jsonable_encoder(await _register(user_data))
+    except HTTPException as e:
+        return e.status_code, {"detail": e.detail}
+
+async def _register(user_data: UserRegistration) -> Dict:
+    hubspot_service = get_hubspot_service()
     try:
         # Check if user already exists
-        existing_user = hubspot_service.find_user_by_email(user_data.email)
+        existing_user = await hubspot_service.find_user_by_email_async(user_data.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,8 +81,14 @@ async def register_user(user_data: UserRegistration):
             registered_at=datetime.utcnow()
         )
         
-        # Store in HubSpot
-        success = hubspot_service.add_user(user)
+        # Queue for HubSpot; the contact is created by the background flusher
+        success = await hubspot_service.queue_user(user)
+        
+        if not success and hubspot_service.registration_queue is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email already exists"
+            )
         
         if not success:
             raise HTTPException(
@@ -55,7 +110,7 @@ async def register_user(user_data: UserRegistration):
             data=user_response.dict(),
             message="User registered successfully"
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -70,7 +125,7 @@ async def register_user(user_data: UserRegistration):
 async def check_email_exists(email: str):
     """Check if an email is already registered"""
     try:
-        user = hubspot_service.find_user_by_email(email)
+        user = await get_hubspot_service().find_user_by_email_async(email)
         return create_api_response(
             success=True,
             data={"exists": user is not None}
@@ -34,7 +34,62 @@ class Settings(BaseSettings):
     # HubSpot Configuration
     HUBSPOT_API_KEY: str = ""
     HUBSPOT_LIST_ID: str = ""  # Optional, for adding users to a specific list
-
+    HUBSPOT_BASE_URL: str = "https://api.hubapi.com"
+    HUBSPOT_TIMEOUT: float = 5.0  # Seconds per API call, including waiting for a connection
+    HUBSPOT_MAX_CONNECTIONS: int = 20  # Pooled keep-alive connections per worker
+    HUBSPOT_MAX_CONCURRENCY: int = 10  # Concurrent in-flight API calls per worker
+    HUBSPOT_RATE_LIMIT: int = 100  # Calls per HUBSPOT_RATE_PERIOD per worker; split the app's quota across workers
+    HUBSPOT_RATE_PERIOD: float = 10.0
+    HUBSPOT_SEARCH_RATE_LIMIT: int = 5  # Search API calls per second
+    HUBSPOT_MAX_RETRIES: int = 2  # Retries of a call failing with 429/5xx or a network error
+    HUBSPOT_RETRY_BACKOFF: float = 0.5  # Base seconds of the jittered exponential backoff
+    HUBSPOT_BREAKER_FAILURES: int = 5  # Consecutive failed calls that open the circuit breaker
+    HUBSPOT_BREAKER_RESET: float = 30.0  # Seconds before a trial call is let through
+    
+    # Email existence cache in front of HubSpot contact search
+    EMAIL_CACHE_SIZE: int = 10000
+    EMAIL_CACHE_TTL: float = 3600  # Seconds to remember a registered email
+    EMAIL_CACHE_NEGATIVE_TTL: float = 60  # Seconds to remember an unknown email
+    # Filter of known emails shared by all workers, rebuilt from HubSpot by one of them
+    EMAIL_FILTER_PATH: Path = Path("./data/email_filter.db")
+    EMAIL_FILTER_CAPACITY: int = 100000  # Expected number of known emails
+    EMAIL_FILTER_REFRESH_INTERVAL: float = 86400  # Seconds between full rebuilds (0 disables the filter)
+    
+    # Write-behind registration queue flushed through HubSpot batch create
+    REGISTRATION_WRITE_BEHIND: bool = True
+    REGISTRATION_QUEUE_PATH: Path = Path("./data/registration_queue.db")
+    REGISTRATION_BATCH_SIZE: int = 100  # HubSpot's batch create limit
+    REGISTRATION_FLUSH_INTERVAL: float = 1.0  # Seconds between flushes of a partial batch
+    REGISTRATION_MAX_ATTEMPTS: int = 5  # Then the registration is stored locally
+    REGISTRATION_DRAIN_TIMEOUT: float = 10.0  # Seconds to keep flushing on shutdown
+    
+    # Local fallback store for users that could not be sent to HubSpot
+    LOCAL_USERS_PATH: Path = Path("./data/local_users.db")
+    # Old JSON fallback file, imported into the store once and renamed to *.imported
+    LOCAL_USERS_IMPORT_PATH: Path = Path("./data/local_users.json")
+    LOCAL_USERS_RECONCILE_INTERVAL: float = 300  # Seconds between syncs of local users to HubSpot (0 disables)
+    LOCAL_USERS_RECONCILE_CONCURRENCY: int = 4  # Batches of 100 in flight during a sync
+    
+    # Outcomes of registrations sent with an Idempotency-Key header, shared by all workers
+    IDEMPOTENCY_PATH: Path = Path("./data/idempotency.db")
+    IDEMPOTENCY_TTL: float = 86400  # Seconds a key's response is replayed
+    IDEMPOTENCY_WAIT: float = 10.0  # Seconds a retry waits for the first request to finish
+    
+    # Learning progress, buffered in memory and written in batches
+    PROGRESS_DB_PATH: Path = Path("./data/progress.db")
+    PROGRESS_FLUSH_INTERVAL: float = 0.5  # Seconds updates may wait before being written
+    
+    # Metrics served at /metrics, summed over every worker through a shared file
+    METRICS_DB_PATH: Path = Path("./data/metrics.db")
+    METRICS_PUBLISH_INTERVAL: float = 5.0  # Seconds between publishes of a worker's totals (0: this worker only)
+    
+    # Sampling profiler for individual requests (app.api.middleware.ProfilingMiddleware)
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of requests to profile (0 disables sampling)
+    PROFILE_DEBUG_TOKEN: str = ""  # Requests with this X-Debug-Profile header are profiled (empty disables)
+    PROFILE_DIR: Path = Path("./data/profiles")
+    PROFILE_MAX_FILES: int = 200  # Newest profiles kept on disk
+    PROFILE_INTERVAL: float = 0.001  # Seconds between stack samples
+    
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
@@ -45,6 +100,14 @@ class Settings(BaseSettings):
     
     # Content Path
     CONTENT_BASE_PATH: Path = Path("./content/modules")
+    # Compiled content bundle (scripts/import_content.py compile); used instead of
+    # the JSON files when present
+    CONTENT_BUNDLE_PATH: Path = Path("./content/modules.bundle")
+    # Seconds between checks for changed content files (0 disables hot reload)
+    CONTENT_RELOAD_INTERVAL: float = 5.0
+    # Leave correctAnswer and explanation out of served quizzes; clients grade them
+    # through POST /learning/{area}/quizzes/grade instead
+    QUIZ_HIDE_ANSWERS: bool = False
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,153 @@
+# backend/app/db/email_filter.py
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from app.db.session import connect, transaction
+
+class BloomFilter:
+    """Probabilistic set membership: no false negatives, tunable false positives"""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def add(self, item: str) -> None:
+        for position in bloom_positions(item, self.size, self.hash_count):
+            self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in bloom_positions(item, self.size, self.hash_count)
+        )
+
+def bloom_positions(item: str, size: int, hash_count: int) -> Iterator[int]:
+    """Bit positions of ``item`` (double hashing of one blake2b digest)"""
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    for i in range(hash_count):
+        yield (h1 + i * h2) % size
+
+class EmailFilterStore:
+    """Bloom filter of registered emails, shared by every worker.
+    
+    The bit array is a BLOB updated in place: a lookup reads a few bytes
+    with incremental blob I/O and an email added by one worker is seen by
+    all of them once it commits. A rebuilt filter is seeded in memory by
+    one worker and written as a new generation; emails added while it is
+    being built go into every generation, so none are lost in the swap.
+    """
+    
+    def __init__(self, path: Path, capacity: int = 100000, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS email_filters (
+                generation INTEGER PRIMARY KEY,
+                size INTEGER NOT NULL,
+                hash_count INTEGER NOT NULL,
+                bits BLOB NOT NULL,
+                seeded_at REAL
+            )
+            """
+        )
+        # (generation, size, hash_count, seeded_at) of the newest seeded filter, as last read
+        self._current: Optional[Tuple[int, int, int, float]] = None
+    
+    def _read_current(self) -> Optional[Tuple[int, int, int, float]]:
+        row = self._conn.execute(
+            """
+            SELECT generation, size, hash_count, seeded_at FROM email_filters
+            WHERE seeded_at IS NOT NULL ORDER BY generation DESC LIMIT 1
+            """
+        ).fetchone()
+        return tuple(row) if row else None
+    
+    def seeded_at(self) -> Optional[float]:
+        """When the current filter was seeded (None if there is none yet)"""
+        with self._lock:
+            self._current = self._read_current()
+            return self._current[3] if self._current else None
+    
+    def might_contain(self, email: str, max_age: float) -> Optional[bool]:
+        """False if ``email`` was never added to the current filter.
+        
+        Returns None when there is no filter seeded in the last ``max_age``
+        seconds, i.e. the filter cannot rule the email out.
+        """
+        with self._lock:
+            for attempt in range(2):
+                if attempt or self._current is None:
+                    self._current = self._read_current()
+                if self._current is None:
+                    return None
+                generation, size, hash_count, seeded_at = self._current
+                if time.time() - seeded_at >= max_age:
+                    # Another worker may have swapped in a newer filter
+                    continue
+                try:
+                    with self._conn.blobopen("email_filters", "bits", generation, readonly=True) as blob:
+                        return all(
+                            blob[position >> 3] & (1 << (position & 7))
+                            for position in bloom_positions(email, size, hash_count)
+                        )
+                except sqlite3.OperationalError:
+                    # Replaced by a newer generation since it was read
+                    continue
+            return None
+    
+    def add(self, email: str) -> None:
+        """Add ``email`` to the current filter and to any filter being built"""
+        with self._lock, transaction(self._conn):
+            rows = self._conn.execute("SELECT generation, size, hash_count FROM email_filters").fetchall()
+            for generation, size, hash_count in rows:
+                with self._conn.blobopen("email_filters", "bits", generation) as blob:
+                    for position in bloom_positions(email, size, hash_count):
+                        blob[position >> 3] = blob[position >> 3] | (1 << (position & 7))
+    
+    def begin_seed(self) -> Tuple[int, BloomFilter]:
+        """Start a new generation; returns its number and the in-memory filter to seed"""
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        with self._lock, transaction(self._conn):
+            # Left behind by a seed that never finished
+            self._conn.execute("DELETE FROM email_filters WHERE seeded_at IS NULL")
+            cursor = self._conn.execute(
+                "INSERT INTO email_filters (size, hash_count, bits) VALUES (?, ?, zeroblob(?))",
+                (bloom.size, bloom.hash_count, len(bloom.bits))
+            )
+            return cursor.lastrowid, bloom
+    
+    def finish_seed(self, generation: int, bloom: BloomFilter) -> None:
+        """Make ``bloom``, plus the emails added since begin_seed, the current filter"""
+        with self._lock, transaction(self._conn):
+            row = self._conn.execute(
+                "SELECT bits FROM email_filters WHERE generation = ?", (generation,)
+            ).fetchone()
+            if row is None:
+                raise RuntimeError(f"Email filter generation {generation} was discarded")
+            added = int.from_bytes(row["bits"], "little")
+            bits = (int.from_bytes(bloom.bits, "little") | added).to_bytes(len(bloom.bits), "little")
+            self._conn.execute(
+                "UPDATE email_filters SET bits = ?, seeded_at = ? WHERE generation = ?",
+                (bits, time.time(), generation)
+            )
+            self._conn.execute("DELETE FROM email_filters WHERE generation < ?", (generation,))
+            self._current = None
+    
+    def abort_seed(self, generation: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM email_filters WHERE generation = ? AND seeded_at IS NULL", (generation,))
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
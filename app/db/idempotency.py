@@ -0,0 +1,85 @@
+# backend/app/db/idempotency.py
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+from app.db.session import connect, transaction
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str
+    status_code: Optional[int]  # None while the first request is still running
+    body: Any
+
+class IdempotencyStore:
+    """Outcomes of requests sent with an ``Idempotency-Key`` header.
+    
+    The first request with a key claims it with a pending row; the row is
+    filled in with the response once it is known, so a retry that reaches
+    any worker replays that response instead of running the request again.
+    """
+    
+    def __init__(self, path: Path, ttl: float = 86400, pending_ttl: float = 60):
+        self.ttl = ttl
+        # A claim whose worker died before completing it is dropped after this long
+        self.pending_ttl = pending_ttl
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS idempotency_keys (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status_code INTEGER,
+                body TEXT,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idempotency_expiry ON idempotency_keys (expires_at)")
+    
+    def claim(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """Claim ``key`` for a new request; returns the existing record if it is already taken"""
+        now = time.time()
+        with self._lock, transaction(self._conn):
+            self._conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+            row = self._conn.execute(
+                "SELECT fingerprint, status_code, body FROM idempotency_keys WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                body = json.loads(row["body"]) if row["body"] is not None else None
+                return IdempotencyRecord(row["fingerprint"], row["status_code"], body)
+            self._conn.execute(
+                "INSERT INTO idempotency_keys (key, fingerprint, expires_at) VALUES (?, ?, ?)",
+                (key, fingerprint, now + self.pending_ttl)
+            )
+        return None
+    
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, status_code, body FROM idempotency_keys WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        body = json.loads(row["body"]) if row["body"] is not None else None
+        return IdempotencyRecord(row["fingerprint"], row["status_code"], body)
+    
+    def complete(self, key: str, status_code: int, body: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE idempotency_keys SET status_code = ?, body = ?, expires_at = ? WHERE key = ?",
+                (status_code, json.dumps(body), time.time() + self.ttl, key)
+            )
+    
+    def release(self, key: str) -> None:
+        """Forget a claim so that the request can be retried (e.g. after a server error)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
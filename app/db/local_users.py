@@ -0,0 +1,129 @@
+# backend/app/db/local_users.py
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.db.session import connect, transaction
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+class LocalUserStore:
+    """Append-only store for users that could not be written to HubSpot.
+    
+    Each insert is a single-row append, and an index on the normalized
+    email makes lookups constant-time regardless of how many users have
+    piled up. WAL mode plus the busy timeout lets every uvicorn worker
+    write to the same file without losing each other's rows.
+    """
+    
+    def __init__(self, path: Path):
+        self._conn = connect(path, synchronous="FULL")
+        self._lock = threading.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS users_email ON users (email)")
+        # Progress markers and leases of background jobs reading the store
+        self._conn.execute("CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+    
+    def add(self, user: User) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO users (email, payload, stored_at) VALUES (?, ?, ?)",
+                (user.email.strip().lower(), json.dumps(user.to_dict()), time.time())
+            )
+    
+    def find(self, email: str) -> Optional[Dict]:
+        """Most recently stored user with this email"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM users WHERE email = ? ORDER BY id DESC LIMIT 1",
+                (email.strip().lower(),)
+            ).fetchone()
+        return json.loads(row["payload"]) if row else None
+    
+    def emails(self) -> List[str]:
+        with self._lock:
+            return [row["email"] for row in self._conn.execute("SELECT DISTINCT email FROM users")]
+    
+    def read_after(self, after_id: int, limit: int) -> List[Tuple[int, Dict]]:
+        """Next ``limit`` users stored after row ``after_id``, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM users WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+            ).fetchall()
+        return [(row["id"], json.loads(row["payload"])) for row in rows]
+    
+    def count_after(self, after_id: int) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM users WHERE id > ?", (after_id,)).fetchone()[0]
+    
+    def get_checkpoint(self, name: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM checkpoints WHERE name = ?", (name,)).fetchone()
+        return row["value"] if row else 0
+    
+    def set_checkpoint(self, name: str, value: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO checkpoints (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (name, value)
+            )
+    
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """Take (or extend) a named lease so only one worker runs a job at a time"""
+        now = time.time()
+        with self._lock, transaction(self._conn):
+            row = self._conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row is not None and row["owner"] != owner and row["expires_at"] > now:
+                return False
+            self._conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at",
+                (name, owner, now + ttl)
+            )
+        return True
+    
+    def release_lease(self, name: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+    
+    def import_json(self, json_path: str) -> int:
+        """One-off import of the old ``local_users.json`` file, renamed once imported"""
+        # Claim the file first so that only one worker imports it
+        claimed = json_path + ".importing"
+        try:
+            os.replace(json_path, claimed)
+        except FileNotFoundError:
+            return 0
+        with open(claimed, 'r') as f:
+            users = json.load(f)
+        
+        now = time.time()
+        with self._lock, transaction(self._conn):
+            self._conn.executemany(
+                "INSERT INTO users (email, payload, stored_at) VALUES (?, ?, ?)",
+                [((user.get("email") or "").strip().lower(), json.dumps(user), now) for user in users]
+            )
+        os.replace(claimed, json_path + ".imported")
+        logger.info(f"Imported {len(users)} users from {json_path}")
+        return len(users)
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
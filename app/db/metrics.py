@@ -0,0 +1,105 @@
+# backend/app/db/metrics.py
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Tuple
+from app.db.session import connect, transaction
+
+# (family, kind, sample name, labels JSON, value)
+Sample = Tuple[str, str, str, str, float]
+
+# Pseudo-worker holding the counters of workers that stopped publishing
+RETIRED = "retired"
+
+class MetricsStore:
+    """Latest metric totals of every worker, shared by all of them.
+    
+    Each worker overwrites its own rows with its running totals, so a
+    scrape answered by any worker sums the same numbers. Counters and
+    histograms of workers that went away are folded into a ``retired``
+    row set, which keeps the sums monotonic across restarts; their gauges
+    are dropped.
+    """
+    
+    def __init__(self, path: Path):
+        # Losing the last few seconds of metrics on power loss is fine
+        self._conn = connect(path, synchronous="OFF")
+        self._lock = threading.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metric_samples (
+                worker TEXT NOT NULL,
+                family TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                sample TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (worker, sample, labels)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metric_workers (worker TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+        )
+    
+    def publish(self, worker: str, samples: Iterable[Sample]) -> None:
+        with self._lock, transaction(self._conn):
+            self._conn.executemany(
+                """
+                INSERT INTO metric_samples (worker, family, kind, sample, labels, value)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (worker, sample, labels) DO UPDATE SET value = excluded.value
+                """,
+                [(worker, *sample) for sample in samples]
+            )
+            self._conn.execute(
+                """
+                INSERT INTO metric_workers (worker, updated_at) VALUES (?, ?)
+                ON CONFLICT (worker) DO UPDATE SET updated_at = excluded.updated_at
+                """,
+                (worker, time.time())
+            )
+    
+    def collect(self, live_after: float) -> List[Sample]:
+        """Totals across workers; gauges only count workers seen in the last ``live_after`` seconds"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT s.family, s.kind, s.sample, s.labels, SUM(s.value) AS value
+                FROM metric_samples s LEFT JOIN metric_workers w ON w.worker = s.worker
+                WHERE s.kind != 'gauge' OR w.updated_at > ?
+                GROUP BY s.sample, s.labels
+                ORDER BY s.family, s.sample, s.labels
+                """,
+                (time.time() - live_after,)
+            ).fetchall()
+        return [(row["family"], row["kind"], row["sample"], row["labels"], row["value"]) for row in rows]
+    
+    def retire(self, stale_after: float) -> int:
+        """Fold workers silent for ``stale_after`` seconds into the retired totals; returns how many"""
+        with self._lock, transaction(self._conn):
+            stale = [
+                row["worker"] for row in self._conn.execute(
+                    "SELECT worker FROM metric_workers WHERE updated_at <= ?", (time.time() - stale_after,)
+                )
+            ]
+            if not stale:
+                return 0
+            placeholders = ", ".join("?" * len(stale))
+            self._conn.execute(
+                f"""
+                INSERT INTO metric_samples (worker, family, kind, sample, labels, value)
+                SELECT ?, family, kind, sample, labels, SUM(value) FROM metric_samples
+                WHERE worker IN ({placeholders}) AND kind != 'gauge'
+                GROUP BY sample, labels
+                ON CONFLICT (worker, sample, labels) DO UPDATE SET value = value + excluded.value
+                """,
+                (RETIRED, *stale)
+            )
+            self._conn.execute(f"DELETE FROM metric_samples WHERE worker IN ({placeholders})", stale)
+            self._conn.execute(f"DELETE FROM metric_workers WHERE worker IN ({placeholders})", stale)
+        return len(stale)
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,197 @@
+# backend/app/db/progress.py
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.db.session import connect, transaction
+
+# Analytics counters kept per (area, module); area-wide counters use an empty module id
+AREA = ""
+
+def merge_progress(current: Optional[dict], update: dict) -> dict:
+    """Fold a progress update (or a batch of them) into a user's progress in one area"""
+    merged = dict(current) if current else {
+        "completedModules": [],
+        "startedModules": [],
+        "currentModule": None,
+        "quizScores": {},
+        "lastAccessedAt": None,
+    }
+    # Every module the user has opened, completed or taken the quiz of
+    touched = list(update.get("startedModules", [])) + list(update.get("completedModules", []))
+    touched += list(update.get("quizScores") or {})
+    if update.get("currentModule"):
+        touched.append(update["currentModule"])
+    for module_id in touched:
+        if module_id not in merged["startedModules"]:
+            merged["startedModules"] = merged["startedModules"] + [module_id]
+    for module_id in update.get("completedModules", []):
+        if module_id not in merged["completedModules"]:
+            merged["completedModules"] = merged["completedModules"] + [module_id]
+    if update.get("quizScores"):
+        merged["quizScores"] = {**merged["quizScores"], **update["quizScores"]}
+    if update.get("currentModule"):
+        merged["currentModule"] = update["currentModule"]
+    if update.get("lastAccessedAt") and (
+        merged["lastAccessedAt"] is None or update["lastAccessedAt"] > merged["lastAccessedAt"]
+    ):
+        merged["lastAccessedAt"] = update["lastAccessedAt"]
+    return merged
+
+def counter_changes(before: Optional[dict], after: dict) -> List[Tuple[str, str, float]]:
+    """``(module_id, metric, delta)`` analytics counter changes for one progress write"""
+    changes: List[Tuple[str, str, float]] = []
+    if before is None:
+        changes.append((AREA, "users", 1))
+        before = merge_progress(None, {})
+    for module_id in set(after["startedModules"]) - set(before["startedModules"]):
+        changes.append((module_id, "started", 1))
+    for module_id in set(after["completedModules"]) - set(before["completedModules"]):
+        changes.append((module_id, "completed", 1))
+        changes.append((AREA, "completed", 1))
+    for module_id, score in after["quizScores"].items():
+        previous = before["quizScores"].get(module_id)
+        if previous is None:
+            changes.append((module_id, "quiz_count", 1))
+            changes.append((module_id, "quiz_sum", score))
+        elif previous != score:
+            # A retake replaces the user's previous score
+            changes.append((module_id, "quiz_sum", score - previous))
+    return changes
+
+class ProgressStore:
+    """Per-user learning progress in an embedded SQLite database (one row per user and area).
+    
+    Analytics counters live in the same database and are updated in the
+    transaction that writes the progress, from the difference between the
+    stored and the merged row, so they never need a scan of all users.
+    """
+    
+    def __init__(self, path: Path):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS progress (
+                user_id TEXT NOT NULL,
+                learning_area TEXT NOT NULL,
+                completed_modules TEXT NOT NULL,
+                current_module TEXT,
+                quiz_scores TEXT NOT NULL,
+                last_accessed_at TEXT,
+                PRIMARY KEY (user_id, learning_area)
+            )
+            """
+        )
+        # Every worker runs this at startup; the write lock lets only one of them migrate
+        with transaction(self._conn):
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(progress)")}
+            migrate = "started_modules" not in columns
+            if migrate:
+                self._conn.execute("ALTER TABLE progress ADD COLUMN started_modules TEXT NOT NULL DEFAULT '[]'")
+            migrate |= self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analytics_counters'"
+            ).fetchone() is None
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analytics_counters (
+                    learning_area TEXT NOT NULL,
+                    module_id TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (learning_area, module_id, metric)
+                )
+                """
+            )
+            if migrate:
+                self._backfill()
+    
+    def _backfill(self) -> None:
+        """Derive started modules and the analytics counters from progress stored before they existed"""
+        totals: Dict[Tuple[str, str, str], float] = {}
+        rows = self._conn.execute("SELECT * FROM progress").fetchall()
+        for row in rows:
+            progress = merge_progress(None, self._row_to_progress(row))
+            self._conn.execute(
+                "UPDATE progress SET started_modules = ? WHERE user_id = ? AND learning_area = ?",
+                (json.dumps(progress["startedModules"]), row["user_id"], row["learning_area"])
+            )
+            for module_id, metric, delta in counter_changes(None, progress):
+                key = (row["learning_area"], module_id, metric)
+                totals[key] = totals.get(key, 0) + delta
+        self._conn.execute("DELETE FROM analytics_counters")
+        self._conn.executemany(
+            "INSERT INTO analytics_counters (learning_area, module_id, metric, value) VALUES (?, ?, ?, ?)",
+            [key + (value,) for key, value in totals.items()]
+        )
+    
+    @staticmethod
+    def _row_to_progress(row) -> dict:
+        return {
+            "completedModules": json.loads(row["completed_modules"]),
+            "startedModules": json.loads(row["started_modules"]),
+            "currentModule": row["current_module"],
+            "quizScores": json.loads(row["quiz_scores"]),
+            "lastAccessedAt": row["last_accessed_at"],
+        }
+    
+    def get(self, user_id: str, learning_area: Optional[str] = None) -> Dict[str, dict]:
+        """Progress of a user keyed by learning area"""
+        query = "SELECT * FROM progress WHERE user_id = ?"
+        params: Tuple = (user_id,)
+        if learning_area is not None:
+            query += " AND learning_area = ?"
+            params += (learning_area,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {row["learning_area"]: self._row_to_progress(row) for row in rows}
+    
+    def apply(self, updates: Iterable[Tuple[str, str, dict]]) -> int:
+        """Merge ``(user_id, learning_area, update)`` triples in a single transaction"""
+        count = 0
+        with self._lock, transaction(self._conn):
+            for user_id, learning_area, update in updates:
+                row = self._conn.execute(
+                    "SELECT * FROM progress WHERE user_id = ? AND learning_area = ?", (user_id, learning_area)
+                ).fetchone()
+                before = self._row_to_progress(row) if row else None
+                merged = merge_progress(before, update)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO progress "
+                    "(user_id, learning_area, completed_modules, started_modules, current_module, quiz_scores, "
+                    "last_accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        user_id,
+                        learning_area,
+                        json.dumps(merged["completedModules"]),
+                        json.dumps(merged["startedModules"]),
+                        merged["currentModule"],
+                        json.dumps(merged["quizScores"]),
+                        merged["lastAccessedAt"],
+                    )
+                )
+                self._conn.executemany(
+                    "INSERT INTO analytics_counters (learning_area, module_id, metric, value) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (learning_area, module_id, metric) DO UPDATE SET value = value + excluded.value",
+                    [(learning_area, module_id, metric, delta) for module_id, metric, delta in counter_changes(before, merged)]
+                )
+                count += 1
+        return count
+    
+    def counters(self, learning_area: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Analytics counters as ``{area: {module_id: {metric: value}}}``"""
+        query = "SELECT learning_area, module_id, metric, value FROM analytics_counters"
+        params: Tuple = ()
+        if learning_area is not None:
+            query += " WHERE learning_area = ?"
+            params = (learning_area,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        counters: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for row in rows:
+            counters.setdefault(row["learning_area"], {}).setdefault(row["module_id"], {})[row["metric"]] = row["value"]
+        return counters
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
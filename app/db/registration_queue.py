@@ -0,0 +1,120 @@
+# backend/app/db/registration_queue.py
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+from app.db.session import connect, transaction
+from app.models.user import User
+
+@dataclass
+class QueuedRegistration:
+    id: int
+    email: str
+    user: dict
+    attempts: int
+
+class RegistrationQueue:
+    """Durable queue of registrations waiting to be written to HubSpot.
+    
+    Rows are claimed with a lease inside an IMMEDIATE transaction, so the
+    flushers of several uvicorn workers can share one queue file without
+    sending the same registration twice. A claim that is never completed
+    (e.g. the worker died) becomes visible again once the lease expires.
+    """
+    
+    def __init__(self, path: Path):
+        # Every accepted registration must survive a crash before we reply
+        self._conn = connect(path, synchronous="FULL")
+        self._lock = threading.Lock()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS registrations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS registrations_available ON registrations (available_at)")
+    
+    def enqueue(self, user: User) -> bool:
+        """Queue a registration; returns False if the email is already queued"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO registrations (email, payload, enqueued_at) VALUES (?, ?, ?)",
+                (user.email.strip().lower(), json.dumps(user.to_dict()), time.time())
+            )
+            return cursor.rowcount == 1
+    
+    def contains(self, email: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM registrations WHERE email = ?", (email.strip().lower(),)
+            ).fetchone()
+            return row is not None
+    
+    def emails(self) -> List[str]:
+        with self._lock:
+            return [row["email"] for row in self._conn.execute("SELECT email FROM registrations")]
+    
+    def claim(self, limit: int, lease: float) -> List[QueuedRegistration]:
+        """Claim up to ``limit`` due registrations for ``lease`` seconds"""
+        now = time.time()
+        with self._lock, transaction(self._conn):
+            rows = self._conn.execute(
+                "SELECT id, email, payload, attempts FROM registrations "
+                "WHERE available_at <= ? ORDER BY id LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE registrations SET available_at = ? WHERE id = ?",
+                [(now + lease, row["id"]) for row in rows]
+            )
+        return [
+            QueuedRegistration(id=row["id"], email=row["email"], user=json.loads(row["payload"]), attempts=row["attempts"])
+            for row in rows
+        ]
+    
+    def complete(self, ids: List[int]) -> None:
+        if not ids:
+            return
+        with self._lock, transaction(self._conn):
+            self._conn.executemany("DELETE FROM registrations WHERE id = ?", [(i,) for i in ids])
+    
+    def release(self, ids: List[int]) -> None:
+        """Hand claimed registrations back without counting an attempt"""
+        if not ids:
+            return
+        with self._lock, transaction(self._conn):
+            self._conn.executemany("UPDATE registrations SET available_at = 0 WHERE id = ?", [(i,) for i in ids])
+    
+    def retry_later(self, ids: List[int], delay: float) -> None:
+        """Release claimed registrations to be retried after ``delay`` seconds"""
+        if not ids:
+            return
+        with self._lock, transaction(self._conn):
+            self._conn.executemany(
+                "UPDATE registrations SET attempts = attempts + 1, available_at = ? WHERE id = ?",
+                [(time.time() + delay, i) for i in ids]
+            )
+    
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0]
+    
+    def next_available_in(self) -> Optional[float]:
+        """Seconds until the next registration becomes claimable (None if the queue is empty)"""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(available_at) FROM registrations").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,31 @@
+# backend/app/db/session.py
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+def connect(path: Path, synchronous: str = "NORMAL") -> sqlite3.Connection:
+    """Open an embedded SQLite database tuned for several uvicorn workers.
+    
+    WAL lets readers proceed while one writer commits, and the busy
+    timeout makes concurrent writers from other workers wait for the lock
+    instead of failing. ``synchronous="FULL"`` also survives power loss at
+    the cost of an fsync per commit.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """Run statements in one IMMEDIATE transaction (a single commit/fsync)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
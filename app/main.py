@@ -1,10 +1,21 @@
 # backend/app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from app.api.v1.api import api_router
+from app.api.middleware import MetricsMiddleware, ProfilingMiddleware
 from app.core.config import settings
+from app.api.v1.endpoints.learning import (
+    content_responses, get_learning_content, get_progress_writer, search_index
+)
+from app.api.v1.endpoints.users import get_idempotency_store
+from app.services.learning_content import watch_content
+from app.services.hubspot import get_hubspot_service
+from app.services.metrics import CONTENT_TYPE, MetricsPublisher, registry
+from app.services.profiler import RequestProfiler
 
 # Define a list of allowed origins
 origins = [
@@ -23,13 +34,68 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+metrics_publisher = MetricsPublisher(
+    registry,
+    settings.METRICS_DB_PATH if settings.METRICS_PUBLISH_INTERVAL > 0 else None,
+    interval=settings.METRICS_PUBLISH_INTERVAL
+)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up Virtual Tech Box Learning Platform API...")
+    # Stores and clients are created here rather than at import time, so
+    # importing the app (tests, scripts, every worker) stays cheap
+    learning_content = get_learning_content()
+    progress_writer = get_progress_writer()
+    hubspot_service = get_hubspot_service()
+    idempotency_store = get_idempotency_store()
+    # Warm the content indexes before the worker accepts traffic
+    learning_content.add_listener(content_responses.warm)
+    learning_content.add_listener(search_index.update)
+    await asyncio.to_thread(learning_content.load_all)
+    
+    background_tasks = []
+    if settings.CONTENT_RELOAD_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            watch_content(learning_content, settings.CONTENT_RELOAD_INTERVAL)
+        ))
+    if settings.EMAIL_FILTER_REFRESH_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            hubspot_service.refresh_email_filter(settings.EMAIL_FILTER_REFRESH_INTERVAL)
+        ))
+    if hubspot_service.reconciler is not None and settings.LOCAL_USERS_RECONCILE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(
+            hubspot_service.reconciler.run(settings.LOCAL_USERS_RECONCILE_INTERVAL)
+        ))
+    flusher = hubspot_service.registration_flusher
+    if flusher is not None:
+        flusher.start()
+    progress_writer.start()
+    metrics_publisher.start()
     yield
     # Shutdown
     logger.info("Shutting down...")
+    for task in background_tasks:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if flusher is not None:
+        await flusher.stop(settings.REGISTRATION_DRAIN_TIMEOUT)
+    await progress_writer.stop()
+    await metrics_publisher.stop()
+    await hubspot_service.aclose()
+    progress_writer.store.close()
+    idempotency_store.close()
+    # Everything above belongs to this lifespan; a later one (tests, an
+    # in-process server restart) starts again from fresh instances
+    learning_content.remove_listener(content_responses.warm)
+    learning_content.remove_listener(search_index.update)
+    search_index.clear()
+    for getter in (get_learning_content, get_progress_writer, get_hubspot_service, get_idempotency_store):
+        getter.cache_clear()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -47,6 +113,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profile sampled requests and those carrying the debug token; left out entirely
+# when neither is configured, so unprofiled deployments pay nothing for it
+if settings.PROFILE_SAMPLE_RATE > 0 or settings.PROFILE_DEBUG_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=RequestProfiler(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES, settings.PROFILE_INTERVAL),
+        sample_rate=settings.PROFILE_SAMPLE_RATE,
+        debug_token=settings.PROFILE_DEBUG_TOKEN or None
+    )
+
+# Outermost, so it times everything the other middleware does too
+app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -62,4 +141,9 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "backend-api"}
\ No newline at end of file
+    return {"status": "healthy", "service": "backend-api"}
+
+# Prometheus scrape endpoint, summed over all workers
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(await metrics_publisher.exposition(), media_type=CONTENT_TYPE)
\ No newline at end of file
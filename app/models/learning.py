@@ -1,39 +1,403 @@
 # backend/app/models/learning.py
-from typing import List, Optional, Dict
+from typing import Any, Callable, List, Mapping, Optional, Dict, Sequence, Tuple
+from dataclasses import dataclass, field
 from pathlib import Path
-import json
+import asyncio
+import logging
+import time
 import yaml
+from pydantic import ValidationError
+from app.schemas.learning import Module
+from app.services.content_bundle import BundledIndex, BundledModules, ContentBundle, response_key
+from app.services.metrics import registry
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_LOOKUPS = registry.counter(
+    "learning_content_lookups_total", "Area snapshot lookups; a miss loads the area", ["result"]
+)
+SNAPSHOT_LOAD_SECONDS = registry.histogram(
+    "learning_content_load_seconds", "Time to scan an area's files or open a content bundle", ["source"]
+)
+
+# (st_mtime_ns, st_size) of a module file when it was parsed
+FileSignature = Tuple[int, int]
+
+@dataclass(frozen=True)
+class AreaSnapshot:
+    """Immutable view of one learning area.
+    
+    Reloads build a new snapshot and swap it in, so a request holding a
+    snapshot keeps a consistent view for its whole lifetime. State derived
+    from the content (e.g. encoded responses) is attached to a snapshot
+    before it is published and is dropped along with it.
+    """
+    area: str
+    modules: Sequence[dict]
+    module_index: Mapping[str, dict]
+    lesson_index: Mapping[str, dict]
+    # lesson id -> id of the module it belongs to
+    lesson_modules: Dict[str, str]
+    # Module/lesson metadata without lesson bodies, for catalogue views
+    summaries: List[dict]
+    # module id -> answer key of its quiz, for grading without scanning modules
+    answer_keys: Mapping[str, dict] = field(default_factory=dict)
+    # module id -> token that changes whenever the module's content does
+    module_versions: Mapping[str, str] = field(default_factory=dict)
+    files: Dict[Path, Tuple[FileSignature, Optional[dict]]] = field(default_factory=dict)
+    # Set when the snapshot is served from a compiled bundle
+    bundle: Optional[ContentBundle] = None
+    # Encoded responses keyed by (kind, name), filled in by content listeners
+    responses: Dict[Tuple[str, str], Any] = field(default_factory=dict)
+
+SUMMARY_LESSON_FIELDS = ("id", "title", "type")
+
+def summarize_module(module: dict) -> dict:
+    """Project a module down to its metadata and lesson titles"""
+    summary = {key: value for key, value in module.items() if key not in ("lessons", "quiz")}
+    summary["lessons"] = [
+        {key: lesson[key] for key in SUMMARY_LESSON_FIELDS if key in lesson}
+        for lesson in module.get("lessons", [])
+    ]
+    return summary
+
+# Question fields that give the answer away
+ANSWER_FIELDS = ("correctAnswer", "explanation")
+
+def build_answer_keys(modules: Sequence[dict]) -> Dict[str, dict]:
+    """Index the quiz answers of ``modules`` by module id"""
+    answer_keys = {}
+    for module in modules:
+        quiz = module.get("quiz")
+        if not quiz:
+            continue
+        answer_keys[module["id"]] = {
+            "quizId": quiz["id"],
+            "passingScore": quiz["passingScore"],
+            "questions": {
+                question["id"]: {field: question.get(field) for field in ANSWER_FIELDS}
+                for question in quiz.get("questions", [])
+            },
+        }
+    return answer_keys
+
+def strip_answers(module: dict) -> dict:
+    """Copy of ``module`` whose quiz questions carry no answers"""
+    quiz = module.get("quiz")
+    if not quiz:
+        return module
+    questions = [
+        {key: value for key, value in question.items() if key not in ANSWER_FIELDS}
+        for question in quiz.get("questions", [])
+    ]
+    return dict(module, quiz=dict(quiz, questions=questions))
+
+def validate_module(module_data) -> dict:
+    """Validate raw module data against the Module schema.
+    
+    Returns the normalized dict that gets encoded and served, so requests
+    never pay for validation.
+    """
+    return Module.model_validate(module_data).model_dump(mode="json", exclude_none=True)
+
+def load_module_file(module_file: Path) -> dict:
+    """Parse and validate a module JSON file; raises ValueError if it is invalid"""
+    try:
+        module = Module.model_validate_json(module_file.read_bytes())
+    except ValidationError as e:
+        raise ValueError(f"invalid module: {e}") from None
+    return module.model_dump(mode="json", exclude_none=True)
+
+def _file_signature(path: Path) -> FileSignature:
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+# Called with the areas about to change: their new snapshots, or None for removed areas
+ContentListener = Callable[["LearningContent", Dict[str, Optional["AreaSnapshot"]]], None]
 
 class LearningContent:
-    def __init__(self, content_path: Path):
+    def __init__(self, content_path: Path, bundle_path: Optional[Path] = None, hide_answers: bool = False):
         self.content_path = content_path
-        self._modules_cache: Dict[str, List[dict]] = {}
+        self.bundle_path = bundle_path
+        # Serve quizzes without their answers (see strip_answers)
+        self.hide_answers = hide_answers
+        self._snapshots: Dict[str, AreaSnapshot] = {}
+        self._bundle_signature: Optional[FileSignature] = None
+        # Bundle compiled with quiz answers while they must be hidden
+        self._rejected_bundle: Optional[FileSignature] = None
+        # Areas with no content directory, so misses don't hit the filesystem
+        self._missing_areas: set = set()
+        # In-flight loads, shared by every request that misses the same area
+        self._loading = SingleFlight()
+        self._listeners: List[ContentListener] = []
+        # Module files that failed to parse or validate, with the reason
+        self.errors: Dict[Path, str] = {}
     
-    def get_modules_for_area(self, learning_area: str) -> List[dict]:
-        if learning_area in self._modules_cache:
-            return self._modules_cache[learning_area]
+    def add_listener(self, listener: ContentListener) -> None:
+        """Call ``listener(content, snapshots)`` whenever areas are loaded, replaced or removed.
+        
+        Listeners run before the new snapshots are published, so whatever
+        they derive from them is in place by the first request that sees
+        them; ``get_loaded_snapshot`` still returns the previous ones.
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: ContentListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, snapshots: Dict[str, Optional[AreaSnapshot]]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(self, snapshots)
+            except Exception as e:
+                logger.error(f"Content listener {listener} failed for {sorted(snapshots)}: {e}")
+    
+    def _publish(self, snapshots: Dict[str, Optional[AreaSnapshot]]) -> None:
+        """Swap in new snapshots (None removes an area) with a single assignment"""
+        published = dict(self._snapshots)
+        for area, snapshot in snapshots.items():
+            if snapshot is None:
+                published.pop(area, None)
+            else:
+                published[area] = snapshot
+        self._snapshots = published
+    
+    @property
+    def uses_bundle(self) -> bool:
+        if self.bundle_path is None or not self.bundle_path.exists():
+            return False
+        return self._rejected_bundle is None or self._rejected_bundle != _file_signature(self.bundle_path)
+    
+    def load_all(self) -> None:
+        """Load every learning area under the content path and build the lookup indexes"""
+        self.refresh()
+        logger.info(
+            f"Loaded {sum(len(s.modules) for s in self._snapshots.values())} modules "
+            f"across {len(self._snapshots)} learning areas"
+        )
+    
+    def refresh(self) -> List[str]:
+        """Re-scan the content path, re-parsing only files that changed.
+        
+        Returns the learning areas whose snapshot was replaced or removed,
+        once the listeners have prepared them and they are published.
+        """
+        self._missing_areas.clear()
+        if self.uses_bundle:
+            changes = self._refresh_bundle()
+        else:
+            changes = self._refresh_files()
+        
+        if changes:
+            self._notify(changes)
+            self._publish(changes)
+        return list(changes)
+    
+    def _refresh_files(self) -> Dict[str, Optional[AreaSnapshot]]:
+        """New snapshots of the areas whose files changed (None for removed areas), not yet published"""
+        if not self.content_path.exists():
+            logger.warning(f"Content path {self.content_path} does not exist")
+            return {}
+        
+        changes: Dict[str, Optional[AreaSnapshot]] = {}
+        present = set()
+        for area_path in sorted(self.content_path.iterdir()):
+            if not area_path.is_dir():
+                continue
+            present.add(area_path.name)
+            snapshot = self._load_area(area_path.name)
+            if snapshot is not None:
+                changes[area_path.name] = snapshot
         
+        for area in self._snapshots:
+            if area not in present:
+                changes[area] = None
+        
+        return changes
+    
+    def _refresh_bundle(self) -> Dict[str, Optional[AreaSnapshot]]:
+        """Swap in every area from the compiled bundle if the bundle file changed"""
+        signature = _file_signature(self.bundle_path)
+        if signature == self._bundle_signature:
+            return []
+        
+        start = time.perf_counter()
+        bundle = ContentBundle(self.bundle_path)
+        if self.hide_answers and not bundle.answers_hidden:
+            logger.error(
+                f"Content bundle {self.bundle_path} includes quiz answers but they must be hidden; "
+                f"serving the JSON files until it is recompiled"
+            )
+            self._rejected_bundle = signature
+            self._bundle_signature = None
+            # Bundled areas without JSON files are dropped along with the bundle
+            changes: Dict[str, Optional[AreaSnapshot]] = dict.fromkeys(self._snapshots)
+            changes.update(self._refresh_files())
+            return changes
+        
+        snapshots = {}
+        for area, entry in bundle.areas.items():
+            modules = BundledModules(bundle, area, entry["modules"])
+            answer_keys = entry.get("answerKeys")
+            if answer_keys is None:
+                # Bundles compiled before grading existed; index them once here
+                answer_keys = build_answer_keys(modules)
+            responses = entry.get("responses", {})
+            module_versions = {
+                module_id: responses[response_key("module", module_id)]["etag"]
+                for module_id in entry["modules"]
+                if response_key("module", module_id) in responses
+            }
+            snapshots[area] = AreaSnapshot(
+                area=area,
+                modules=modules,
+                module_index=BundledIndex(bundle, area, "module", entry["modules"]),
+                lesson_index=BundledIndex(bundle, area, "lesson", list(entry["lessons"])),
+                lesson_modules=entry["lessons"],
+                summaries=entry["summaries"],
+                answer_keys=answer_keys,
+                module_versions=module_versions,
+                bundle=bundle
+            )
+        
+        self._bundle_signature = signature
+        SNAPSHOT_LOAD_SECONDS.observe(time.perf_counter() - start, "bundle")
+        logger.info(f"Opened content bundle {self.bundle_path}")
+        return {area: snapshots.get(area) for area in sorted(set(self._snapshots) | set(snapshots))}
+    
+    def _load_area(self, learning_area: str) -> Optional[AreaSnapshot]:
+        """Build (but do not publish) a new snapshot if the area's files changed, else return None"""
+        if self.uses_bundle:
+            # The bundle holds every compiled area; there is nothing to parse, and an
+            # area it lacks stays missing until the bundle changes
+            if self._bundle_signature is not None and learning_area not in self._snapshots:
+                self._missing_areas.add(learning_area)
+            return None
+        
+        start = time.perf_counter()
+        try:
+            return self._scan_area(learning_area)
+        finally:
+            SNAPSHOT_LOAD_SECONDS.observe(time.perf_counter() - start, "files")
+    
+    def _scan_area(self, learning_area: str) -> Optional[AreaSnapshot]:
         area_path = self.content_path / learning_area
         if not area_path.exists():
-            return []
+            self._missing_areas.add(learning_area)
+            return None
+        
+        previous = self._snapshots.get(learning_area)
+        previous_files = previous.files if previous else {}
         
-        modules = []
+        files = {}
+        dirty = previous is None
         for module_file in sorted(area_path.glob("*.json")):
             try:
-                with open(module_file, 'r', encoding='utf-8') as f:
-                    module_data = json.load(f)
-                    modules.append(module_data)
+                stat = module_file.stat()
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            
+            cached = previous_files.get(module_file)
+            if cached is not None and cached[0] == signature:
+                files[module_file] = cached
+                continue
+            
+            dirty = True
+            module_data = cached[1] if cached is not None else None
+            try:
+                module_data = load_module_file(module_file)
+                self.errors.pop(module_file, None)
             except Exception as e:
-                print(f"Error loading module {module_file}: {e}")
+                self.errors[module_file] = str(e)
+                logger.error(f"Error loading module {module_file}: {e}")
+            files[module_file] = (signature, module_data)
+        
+        for stale in [path for path in self.errors if path.parent == area_path and path not in files]:
+            self.errors.pop(stale, None)
+        
+        if not dirty and files.keys() == previous_files.keys():
+            return None
         
+        modules = [module for _, module in files.values() if module is not None]
         # Sort by order
         modules.sort(key=lambda x: x.get('order', 999))
-        self._modules_cache[learning_area] = modules
-        return modules
+        answer_keys = build_answer_keys(modules)
+        if self.hide_answers:
+            modules = [strip_answers(module) for module in modules]
+        
+        module_versions = {
+            module["id"]: f"{signature[0]:x}-{signature[1]:x}"
+            for signature, module in files.values() if module is not None
+        }
+        module_index = {}
+        lesson_index = {}
+        lesson_modules = {}
+        for module in modules:
+            module_index[module.get('id')] = module
+            for lesson in module.get('lessons', []):
+                lesson_index[lesson.get('id')] = lesson
+                lesson_modules[lesson.get('id')] = module.get('id')
+        
+        return AreaSnapshot(
+            area=learning_area,
+            modules=modules,
+            module_index=module_index,
+            lesson_index=lesson_index,
+            lesson_modules=lesson_modules,
+            summaries=[summarize_module(module) for module in modules],
+            answer_keys=answer_keys,
+            module_versions=module_versions,
+            files=files
+        )
+    
+    def get_areas(self) -> List[str]:
+        return list(self._snapshots.keys())
+    
+    def get_loaded_snapshot(self, learning_area: str) -> Optional[AreaSnapshot]:
+        """The published snapshot of an area, without loading it on a miss"""
+        return self._snapshots.get(learning_area)
+    
+    def get_snapshot(self, learning_area: str) -> Optional[AreaSnapshot]:
+        snapshot = self._snapshots.get(learning_area)
+        if snapshot is None and learning_area not in self._missing_areas:
+            SNAPSHOT_LOOKUPS.inc("miss")
+            return self._load_missing_area(learning_area)
+        SNAPSHOT_LOOKUPS.inc("hit")
+        return snapshot
+    
+    async def get_snapshot_async(self, learning_area: str) -> Optional[AreaSnapshot]:
+        """Like get_snapshot, but a cache miss is loaded in a worker thread.
+        
+        Concurrent misses for the same area wait on a single shared load.
+        """
+        snapshot = self._snapshots.get(learning_area)
+        if snapshot is not None or learning_area in self._missing_areas:
+            SNAPSHOT_LOOKUPS.inc("hit")
+            return snapshot
+        
+        SNAPSHOT_LOOKUPS.inc("miss")
+        return await self._loading.do(
+            learning_area, lambda: asyncio.to_thread(self._load_missing_area, learning_area)
+        )
+    
+    def _load_missing_area(self, learning_area: str) -> Optional[AreaSnapshot]:
+        snapshot = self._load_area(learning_area)
+        if snapshot is not None:
+            self._notify({learning_area: snapshot})
+            self._publish({learning_area: snapshot})
+        return self._snapshots.get(learning_area)
+    
+    def get_modules_for_area(self, learning_area: str) -> List[dict]:
+        snapshot = self.get_snapshot(learning_area)
+        return snapshot.modules if snapshot else []
     
     def get_module_by_id(self, learning_area: str, module_id: str) -> Optional[dict]:
-        modules = self.get_modules_for_area(learning_area)
-        for module in modules:
-            if module.get('id') == module_id:
-                return module
-        return None
\ No newline at end of file
+        snapshot = self.get_snapshot(learning_area)
+        return snapshot.module_index.get(module_id) if snapshot else None
+    
+    def get_lesson_by_id(self, learning_area: str, lesson_id: str) -> Optional[dict]:
+        snapshot = self.get_snapshot(learning_area)
+        return snapshot.lesson_index.get(lesson_id) if snapshot else None
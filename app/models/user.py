@@ -19,6 +19,17 @@ class User:
         self.registered_at = registered_at or datetime.utcnow()
         self.row_number = row_number
     
+    @classmethod
+    def from_dict(cls, data: dict) -> "User":
+        """Rebuild a user from the dict produced by to_dict"""
+        return cls(
+            name=data["name"],
+            email=data["email"],
+            phone_number=data["phoneNumber"],
+            learning_area=data["learningArea"],
+            registered_at=datetime.fromisoformat(data["registeredAt"])
+        )
+    
     def to_dict(self):
         return {
             "name": self.name,
@@ -1,6 +1,6 @@
 # backend/app/schemas/learning.py
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
@@ -16,6 +16,10 @@ class ResourceType(str, Enum):
     article = "article"
     github = "github"
 
+class ModuleView(str, Enum):
+    full = "full"
+    summary = "summary"
+
 class CodeExample(BaseModel):
     language: str
     code: str
@@ -31,7 +35,7 @@ class Question(BaseModel):
     id: str
     question: str
     options: List[str]
-    correctAnswer: int
+    correctAnswer: int  # Left out of served modules when QUIZ_HIDE_ANSWERS is set
     explanation: Optional[str] = None
 
 class Quiz(BaseModel):
@@ -55,6 +59,7 @@ class Module(BaseModel):
     estimatedMinutes: int
     lessons: List[Lesson]
     quiz: Optional[Quiz] = None
+    resources: Optional[List[Resource]] = None
 
 class LearningAreaInfo(BaseModel):
     id: str
@@ -72,4 +77,20 @@ class Progress(BaseModel):
     completedModules: List[str]
     currentModule: Optional[str] = None
     quizScores: Dict[str, float]
-    lastAccessedAt: datetime
\ No newline at end of file
+    lastAccessedAt: datetime
+
+class ProgressUpdate(BaseModel):
+    userId: str
+    learningArea: str
+    moduleId: Optional[str] = None
+    lessonId: Optional[str] = None
+    completed: bool = False  # Marks moduleId as completed
+    quizScore: Optional[float] = None  # Quiz score for moduleId
+
+class QuizSubmission(BaseModel):
+    moduleId: str
+    answers: Dict[str, int]  # Question id -> index of the chosen option
+    userId: Optional[str] = None  # Records the score in the user's progress
+
+class QuizBatchSubmission(BaseModel):
+    submissions: List[QuizSubmission] = Field(..., min_length=1, max_length=100)
\ No newline at end of file
@@ -0,0 +1,39 @@
+# backend/app/services/analytics.py
+from typing import Dict, List, Sequence
+from app.db.progress import AREA
+
+def area_analytics(area: str, modules: Sequence[dict], counters: Dict[str, Dict[str, float]]) -> dict:
+    """Per-module statistics of an area, in module order.
+    
+    ``modules`` are the modules currently served for the area (summaries
+    are enough) and ``counters`` the area's analytics counters, so the
+    cost depends on the number of modules, never on the number of users.
+    Counters of modules that are no longer served are left out.
+    """
+    area_counters = counters.get(AREA, {})
+    users = int(area_counters.get("users", 0))
+    rows: List[dict] = []
+    for module in sorted(modules, key=lambda module: module.get("order", 0)):
+        module_counters = counters.get(module.get("id"), {})
+        started = int(module_counters.get("started", 0))
+        completed = int(module_counters.get("completed", 0))
+        quiz_count = int(module_counters.get("quiz_count", 0))
+        rows.append({
+            "moduleId": module.get("id"),
+            "title": module.get("title"),
+            "order": module.get("order"),
+            "started": started,
+            "completed": completed,
+            "completionRate": round(completed / started, 4) if started else 0.0,
+            # Users who reached this module, as a share of everyone who started the area
+            "reach": round(started / users, 4) if users else 0.0,
+            "dropOff": max(0, started - completed),
+            "quizAttempts": quiz_count,
+            "averageQuizScore": round(module_counters.get("quiz_sum", 0) / quiz_count, 2) if quiz_count else None,
+        })
+    return {
+        "learningArea": area,
+        "users": users,
+        "moduleCompletions": int(area_counters.get("completed", 0)),
+        "modules": rows,
+    }
@@ -0,0 +1,194 @@
+# backend/app/services/content_bundle.py
+"""Compiled content bundle shared by every worker through mmap.
+
+Layout::
+
+    MAGIC (8 bytes) | index length (u64, little endian) | index JSON | blobs
+
+The index maps each learning area to its ordered module ids, lesson owners,
+summaries, quiz answer keys and the byte ranges (relative to the start of the blobs) of
+every pre-encoded response and its compressed variants. Workers only parse
+the index at startup; response bodies are read straight from the shared
+page-cache pages when served.
+"""
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from pathlib import Path
+import json
+import logging
+import mmap
+import os
+import struct
+from app.api.deps import EncodedResponse, encode_api_response, negotiate_encoding, variant_etag
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_MAGIC = b"VTBBNDL1"
+_HEADER = struct.Struct("<8sQ")
+
+def response_key(kind: str, name: str) -> str:
+    """Key of a pre-encoded response inside an area, e.g. ``module:devops-docker``"""
+    return f"{kind}:{name}"
+
+class BundledResponse:
+    """Pre-encoded response whose bodies live in the bundle's mmap"""
+    
+    def __init__(self, mm: mmap.mmap, base: int, entry: Dict[str, Any]):
+        self._mm = mm
+        self._base = base
+        self._ranges: Dict[str, Tuple[int, int]] = entry["bodies"]
+        self.etag: str = entry["etag"]
+        self.codings: Tuple[str, ...] = tuple(entry["codings"])
+    
+    def _read(self, coding: str) -> bytes:
+        offset, length = self._ranges[coding]
+        start = self._base + offset
+        return self._mm[start:start + length]
+    
+    @property
+    def body(self) -> bytes:
+        return self._read("identity")
+    
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes, str]:
+        coding = negotiate_encoding(accept_encoding, self.codings)
+        if coding is None:
+            return None, self._read("identity"), self.etag
+        return coding, self._read(coding), variant_etag(self.etag, coding)
+
+class BundledModules(Sequence):
+    """Ordered modules of an area, decoded from the bundle on access"""
+    
+    def __init__(self, bundle: "ContentBundle", area: str, module_ids: List[str]):
+        self._bundle = bundle
+        self._area = area
+        self._ids = module_ids
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._bundle.load(self._area, "module", module_id) for module_id in self._ids[index]]
+        return self._bundle.load(self._area, "module", self._ids[index])
+
+class BundledIndex(Mapping):
+    """id -> record mapping decoded from the bundle on access"""
+    
+    def __init__(self, bundle: "ContentBundle", area: str, kind: str, ids: Sequence[str]):
+        self._bundle = bundle
+        self._area = area
+        self._kind = kind
+        self._ids = frozenset(ids)
+    
+    def __getitem__(self, record_id: str) -> dict:
+        if record_id not in self._ids:
+            raise KeyError(record_id)
+        return self._bundle.load(self._area, self._kind, record_id)
+    
+    def __contains__(self, record_id) -> bool:
+        return record_id in self._ids
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+
+class ContentBundle:
+    """Read-only view of a compiled content bundle"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, index_length = _HEADER.unpack_from(self._mm, 0)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not a content bundle")
+        
+        index_start = _HEADER.size
+        self._base = index_start + index_length
+        self.index: Dict[str, Any] = json.loads(self._mm[index_start:self._base])
+    
+    @property
+    def areas(self) -> Dict[str, Dict[str, Any]]:
+        return self.index["areas"]
+    
+    @property
+    def answers_hidden(self) -> bool:
+        """Whether the bundled modules were compiled without their quiz answers"""
+        return self.index.get("answersHidden", False)
+    
+    def response(self, area: str, key: str) -> Optional[BundledResponse]:
+        entry = self.areas.get(area, {}).get("responses", {}).get(key)
+        if entry is None:
+            return None
+        return BundledResponse(self._mm, self._base, entry)
+    
+    def load(self, area: str, kind: str, record_id: str) -> dict:
+        """Decode one module or lesson from its pre-encoded response"""
+        return json.loads(self.response(area, response_key(kind, record_id)).body)["data"]
+
+def write_bundle(
+    areas: Mapping[str, Sequence[dict]],
+    path: Path,
+    summarize,
+    answer_keys: Optional[Mapping[str, Mapping[str, dict]]] = None,
+    answers_hidden: bool = False
+) -> Dict[str, int]:
+    """Compile loaded areas into a bundle file at ``path``.
+    
+    ``answer_keys`` holds the quiz answer keys of each area and
+    ``answers_hidden`` records whether ``areas`` had their answers
+    stripped. The file is written next to the target and renamed into
+    place, so running workers never observe a partial bundle. Returns
+    per-area module counts.
+    """
+    blobs: List[bytes] = []
+    position = 0
+    
+    def add_response(responses: Dict[str, Any], key: str, encoded: EncodedResponse) -> None:
+        nonlocal position
+        bodies = {}
+        for coding, body in (("identity", encoded.body),) + encoded.variants:
+            bodies[coding] = (position, len(body))
+            blobs.append(body)
+            position += len(body)
+        responses[key] = {"etag": encoded.etag, "codings": list(encoded.codings), "bodies": bodies}
+    
+    index: Dict[str, Any] = {"areas": {}, "answersHidden": answers_hidden}
+    counts = {}
+    for area, modules in areas.items():
+        summaries = [summarize(module) for module in modules]
+        responses: Dict[str, Any] = {}
+        lessons: Dict[str, str] = {}
+        
+        add_response(responses, response_key("area", "full"), encode_api_response(list(modules)))
+        add_response(responses, response_key("area", "summary"), encode_api_response(summaries))
+        for module in modules:
+            add_response(responses, response_key("module", module.get("id")), encode_api_response(module))
+            for lesson in module.get("lessons", []):
+                lessons[lesson.get("id")] = module.get("id")
+                add_response(responses, response_key("lesson", lesson.get("id")), encode_api_response(lesson))
+        
+        index["areas"][area] = {
+            "modules": [module.get("id") for module in modules],
+            "lessons": lessons,
+            "summaries": summaries,
+            "answerKeys": dict((answer_keys or {}).get(area, {})),
+            "responses": responses,
+        }
+        counts[area] = len(modules)
+    
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, len(index_bytes)))
+        f.write(index_bytes)
+        for blob in blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    
+    logger.info(f"Wrote content bundle {path} ({_HEADER.size + len(index_bytes) + position} bytes)")
+    return counts
@@ -0,0 +1,67 @@
+# backend/app/services/email_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a per-entry TTL"""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return ``(hit, value)``; expired entries count as misses"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+    
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class EmailExistenceCache:
+    """Recent answers to "is this email registered?", kept per worker.
+    
+    Registered users are remembered for longer than unknown emails, since
+    an unknown email may be registered by another worker at any moment.
+    The shared filter of known emails is app.db.email_filter.
+    """
+    
+    def __init__(self, max_size: int = 10000, positive_ttl: float = 3600, negative_ttl: float = 60):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(max_size)
+    
+    def lookup(self, email: str) -> Tuple[bool, Optional[dict]]:
+        """Return ``(hit, user)``; a hit with no user is a recent "not registered" answer"""
+        return self._cache.get(normalize_email(email))
+    
+    def store(self, email: str, user: Optional[dict]) -> None:
+        """Remember the result of a remote lookup"""
+        email = normalize_email(email)
+        if user is None:
+            self._cache.set(email, None, self.negative_ttl)
+        else:
+            self.mark_registered(email, user)
+    
+    def mark_registered(self, email: str, user: dict) -> None:
+        self._cache.set(normalize_email(email), user, self.positive_ttl)
@@ -0,0 +1,45 @@
+# backend/app/services/grading.py
+from typing import List, Mapping
+
+def grade_quiz(module_id: str, answer_key: Mapping, answers: Mapping[str, int], reveal_answers: bool = True) -> dict:
+    """Score ``answers`` against a quiz answer key (see build_answer_keys).
+    
+    Unanswered questions count as wrong and answers to questions the quiz
+    does not have are ignored. ``passingScore`` is a number of correct
+    answers; ``score`` is the percentage recorded in learning progress.
+    Without ``reveal_answers`` the correct answers and explanations are
+    only returned once the quiz is passed.
+    """
+    questions: List[dict] = []
+    correct = 0
+    answered = 0
+    for question_id, key in answer_key["questions"].items():
+        answer = answers.get(question_id)
+        is_correct = answer is not None and answer == key["correctAnswer"]
+        answered += answer is not None
+        if is_correct:
+            correct += 1
+        questions.append({
+            "questionId": question_id,
+            "answer": answer,
+            "correct": is_correct,
+        })
+    
+    passed = correct >= answer_key["passingScore"]
+    if reveal_answers or passed:
+        for question, key in zip(questions, answer_key["questions"].values()):
+            question["correctAnswer"] = key["correctAnswer"]
+            question["explanation"] = key["explanation"]
+    
+    total = len(questions)
+    return {
+        "moduleId": module_id,
+        "quizId": answer_key["quizId"],
+        "correct": correct,
+        "total": total,
+        "score": round(100 * correct / total, 2) if total else 0.0,
+        "passingScore": answer_key["passingScore"],
+        "passed": passed,
+        "answered": answered,
+        "questions": questions,
+    }
@@ -1,50 +1,158 @@
 # backend/app/services/hubspot.py
-import os
+import asyncio
+import functools
 import logging
-from typing import Dict, Optional
-import hubspot
-from hubspot.crm.contacts import SimplePublicObjectInput
+import os
+import time
+import uuid
+from typing import Dict, Optional, Tuple
 from app.core.config import settings
 from app.models.user import User
+from app.services.hubspot_client import (
+    CONTACT_PROPERTIES, HubSpotError, contact_properties, contact_to_user, create_async_client
+)
+from app.services.email_cache import EmailExistenceCache, normalize_email
+from app.services.metrics import registry
+from app.services.resilience import CircuitBreaker
+from app.db.email_filter import EmailFilterStore
+from app.db.local_users import LocalUserStore
+from app.db.registration_queue import RegistrationQueue
+from app.services.reconciler import LocalUserReconciler
+from app.services.registration_queue import RegistrationFlusher
 
 logger = logging.getLogger(__name__)
 
+OPERATION_SECONDS = registry.histogram(
+    "hubspot_operation_duration_seconds", "Time spent in HubSpotService operations", ["operation"]
+)
+OPERATION_ERRORS = registry.counter(
+    "hubspot_operation_errors_total", "HubSpotService operations that hit an error", ["operation"]
+)
+LOCAL_FALLBACKS = registry.counter(
+    "hubspot_local_fallbacks_total", "Users written to the local fallback store", ["result"]
+)
+
+# Held (in the local user store) by the one worker rebuilding the shared email filter
+EMAIL_FILTER_LEASE = "email_filter_seed"
+EMAIL_FILTER_LEASE_TTL = 300.0
+
 class HubSpotService:
     def __init__(self):
         self.api_key = settings.HUBSPOT_API_KEY
-        self.client = None
-        self._initialize_service()
+        # HubSpot SDK client for the synchronous methods, created on first use
+        self._client = None
+        self._client_initialized = False
+        # Non-blocking client used by the request handlers
+        self.async_client = create_async_client()
+        self.email_cache = EmailExistenceCache(
+            max_size=settings.EMAIL_CACHE_SIZE,
+            positive_ttl=settings.EMAIL_CACHE_TTL,
+            negative_ttl=settings.EMAIL_CACHE_NEGATIVE_TTL
+        )
+        # Known emails shared by all workers: a miss rules out a HubSpot search
+        self.email_filter = None
+        self.email_filter_max_age = 2 * settings.EMAIL_FILTER_REFRESH_INTERVAL
+        if self.async_client and settings.EMAIL_FILTER_REFRESH_INTERVAL > 0:
+            self.email_filter = EmailFilterStore(settings.EMAIL_FILTER_PATH, settings.EMAIL_FILTER_CAPACITY)
+        self.worker = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.local_users = LocalUserStore(settings.LOCAL_USERS_PATH)
+        try:
+            self.local_users.import_json(str(settings.LOCAL_USERS_IMPORT_PATH))
+        except Exception as e:
+            logger.error(f"Failed to import {settings.LOCAL_USERS_IMPORT_PATH}: {e}")
+        # Copies locally stored users into HubSpot once it is reachable again
+        self.reconciler = None
+        if self.async_client:
+            self.reconciler = LocalUserReconciler(
+                self.local_users,
+                self.async_client,
+                concurrency=settings.LOCAL_USERS_RECONCILE_CONCURRENCY
+            )
+        # Write-behind queue: registrations are accepted locally and flushed in batches
+        self.registration_queue = None
+        self.registration_flusher = None
+        if self.async_client and settings.REGISTRATION_WRITE_BEHIND:
+            self.registration_queue = RegistrationQueue(settings.REGISTRATION_QUEUE_PATH)
+            self.registration_flusher = RegistrationFlusher(
+                self.registration_queue,
+                self.async_client,
+                self._store_locally,
+                batch_size=settings.REGISTRATION_BATCH_SIZE,
+                interval=settings.REGISTRATION_FLUSH_INTERVAL,
+                max_attempts=settings.REGISTRATION_MAX_ATTEMPTS
+            )
+        if not self.api_key:
+            logger.warning("HubSpot API key not provided. HubSpot integration will be disabled.")
+    
+    @property
+    def client(self):
+        """HubSpot SDK client, or None when HubSpot is not configured.
+        
+        The SDK is slow to import and only the synchronous methods use it,
+        so it is loaded the first time one of them runs.
+        """
+        if not self._client_initialized:
+            self._client_initialized = True
+            self._initialize_service()
+        return self._client
+    
+    @property
+    def is_configured(self) -> bool:
+        return self.async_client is not None
+    
+    @property
+    def circuit_state(self) -> Optional[str]:
+        """State of the HubSpot circuit breaker (None when HubSpot is not configured)"""
+        if self.async_client is None:
+            return None
+        return self.async_client.breaker.state
+    
+    @property
+    def circuit_open(self) -> bool:
+        return self.circuit_state == CircuitBreaker.OPEN
+    
+    async def aclose(self) -> None:
+        """Close the HTTP client and the local stores (after the flusher has stopped)"""
+        if self.async_client is not None:
+            await self.async_client.aclose()
+        for store in (self.email_filter, self.registration_queue, self.local_users):
+            if store is not None:
+                store.close()
     
     def _initialize_service(self):
         """Initialize HubSpot API client"""
         try:
             if not self.api_key:
-                logger.warning("HubSpot API key not provided. HubSpot integration will be disabled.")
                 return
             
-            self.client = hubspot.Client.create(api_key=self.api_key)
-            logger.info("HubSpot service initialized successfully")
+            import hubspot
+            from urllib3.util.retry import Retry
             
+            retry = Retry(
+                total=settings.HUBSPOT_MAX_RETRIES,
+                backoff_factor=settings.HUBSPOT_RETRY_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=None
+            )
+            self._client = hubspot.Client.create(api_key=self.api_key, retry=retry)
+            logger.info("HubSpot service initialized successfully")
+        
         except Exception as e:
             logger.error(f"Failed to initialize HubSpot service: {e}")
             logger.info("Falling back to local storage")
     
+    @OPERATION_SECONDS.time("add_user", errors=OPERATION_ERRORS)
     def add_user(self, user: User) -> bool:
         """Add a new user to HubSpot as a contact"""
-        if not self.client:
+        if not self.client or self.circuit_open:
             logger.warning("HubSpot not available, storing locally only")
             return self._store_locally(user)
         
+        from hubspot.crm.contacts import ApiException, SimplePublicObjectInput
+        
         try:
             # Prepare properties for HubSpot contact
-            properties = {
-                "email": user.email,
-                "firstname": user.name.split()[0] if ' ' in user.name else user.name,
-                "lastname": ' '.join(user.name.split()[1:]) if ' ' in user.name else "",
-                "phone": user.phone_number,
-                "vtb_learning_area": user.learning_area,
-                "vtb_registered_at": user.registered_at.strftime("%Y-%m-%d %H:%M:%S UTC")
-            }
+            properties = contact_properties(user)
             
             # Create contact in HubSpot
             simple_public_object_input = SimplePublicObjectInput(properties=properties)
@@ -52,22 +160,26 @@ class HubSpotService:
                 simple_public_object_input=simple_public_object_input
             )
             
+            self._remember_email(user.email)
+            
             # Add to list if configured
             if hasattr(settings, 'HUBSPOT_LIST_ID') and settings.HUBSPOT_LIST_ID:
                 self._add_to_list(api_response.id, settings.HUBSPOT_LIST_ID)
             
             logger.info(f"User {user.email} added to HubSpot")
             return True
-            
-        except hubspot.crm.contacts.exceptions.ApiException as e:
+        
+        except ApiException as e:
             # Check if the error is because the contact already exists (409 Conflict)
             if hasattr(e, 'status') and e.status == 409:
                 logger.warning(f"Contact with email {user.email} already exists in HubSpot")
                 return True  # Consider this a success
             else:
+                OPERATION_ERRORS.inc("add_user")
                 logger.error(f"HubSpot API error: {e}")
                 return self._store_locally(user)
         except Exception as e:
+            OPERATION_ERRORS.inc("add_user")
             logger.error(f"HubSpot API error: {e}")
             return self._store_locally(user)
     
@@ -81,9 +193,14 @@ class HubSpotService:
         except Exception as e:
             logger.error(f"Failed to add contact to list: {e}")
     
+    @OPERATION_SECONDS.time("find_user_by_email", errors=OPERATION_ERRORS)
     def find_user_by_email(self, email: str) -> Optional[Dict]:
-        """Find a user by email in HubSpot"""
-        if not self.client:
+        """Find a user by email in the local fallback store or HubSpot"""
+        local_user = self.local_users.find(email)
+        if local_user is not None:
+            return local_user
+        
+        if not self.client or self.circuit_open:
             return None
         
         try:
@@ -101,7 +218,7 @@ class HubSpotService:
             
             public_object_search_request = {
                 "filterGroups": filter_groups,
-                "properties": ["email", "firstname", "lastname", "phone", "vtb_learning_area", "vtb_registered_at"],
+                "properties": CONTACT_PROPERTIES,
                 "limit": 1
             }
             
@@ -111,45 +228,221 @@ class HubSpotService:
             
             if result.results and len(result.results) > 0:
                 contact = result.results[0]
-                return {
-                    "email": contact.properties.get("email"),
-                    "name": f"{contact.properties.get('firstname', '')} {contact.properties.get('lastname', '')}".strip(),
-                    "phoneNumber": contact.properties.get("phone", ""),
-                    "learningArea": contact.properties.get("vtb_learning_area", ""),
-                    "hubspotId": contact.id
-                }
+                return contact_to_user(contact.id, contact.properties)
             
             return None
+        
+        except Exception as e:
+            OPERATION_ERRORS.inc("find_user_by_email")
+            logger.error(f"Failed to search HubSpot contacts: {e}")
+            return None
+    
+    @OPERATION_SECONDS.time("add_user_async", errors=OPERATION_ERRORS)
+    async def add_user_async(self, user: User) -> bool:
+        """Add a new user to HubSpot as a contact without blocking the event loop"""
+        if not self.async_client or self.circuit_open:
+            logger.warning("HubSpot not available, storing locally only")
+            return await self._store_locally_async(user)
+        
+        try:
+            properties = contact_properties(user)
+            contact = await self.async_client.create_contact(properties)
+            self.email_cache.mark_registered(user.email, contact_to_user(contact["id"], properties))
+            await asyncio.to_thread(self._remember_email, user.email)
             
+            # Add to list if configured
+            if settings.HUBSPOT_LIST_ID:
+                try:
+                    await self.async_client.add_to_list(settings.HUBSPOT_LIST_ID, [contact["id"]])
+                    logger.info(f"Contact {contact['id']} added to list {settings.HUBSPOT_LIST_ID}")
+                except HubSpotError as e:
+                    logger.error(f"Failed to add contact to list: {e}")
+            
+            logger.info(f"User {user.email} added to HubSpot")
+            return True
+        
+        except HubSpotError as e:
+            # Check if the error is because the contact already exists (409 Conflict)
+            if e.status == 409:
+                logger.warning(f"Contact with email {user.email} already exists in HubSpot")
+                self.email_cache.mark_registered(user.email, {"email": user.email})
+                await asyncio.to_thread(self._remember_email, user.email)
+                return True  # Consider this a success
+            OPERATION_ERRORS.inc("add_user_async")
+            logger.error(f"HubSpot API error: {e}")
+            return await self._store_locally_async(user)
+        except Exception as e:
+            OPERATION_ERRORS.inc("add_user_async")
+            logger.error(f"HubSpot API error: {e}")
+            return await self._store_locally_async(user)
+    
+    @OPERATION_SECONDS.time("queue_user", errors=OPERATION_ERRORS)
+    async def queue_user(self, user: User) -> bool:
+        """Accept a registration for a later batched write to HubSpot.
+        
+        Returns False if the email is already waiting in the queue. Falls
+        back to a direct write when the write-behind queue is disabled.
+        """
+        if self.registration_queue is None:
+            return await self.add_user_async(user)
+        
+        if not await asyncio.to_thread(self._enqueue, user):
+            return False
+        self.email_cache.mark_registered(user.email, user.to_dict())
+        self.registration_flusher.notify()
+        return True
+    
+    def _enqueue(self, user: User) -> bool:
+        if not self.registration_queue.enqueue(user):
+            return False
+        self._remember_email(user.email)
+        return True
+    
+    def _remember_email(self, email: str) -> None:
+        """Add an accepted registration to the shared filter, so no worker rules it out"""
+        if self.email_filter is None:
+            return
+        try:
+            self.email_filter.add(normalize_email(email))
         except Exception as e:
+            OPERATION_ERRORS.inc("remember_email")
+            logger.error(f"Failed to add {email} to the email filter: {e}")
+    
+    async def _store_locally_async(self, user: User) -> bool:
+        stored = await asyncio.to_thread(self._store_locally, user)
+        if stored:
+            self.email_cache.mark_registered(user.email, user.to_dict())
+        return stored
+    
+    @OPERATION_SECONDS.time("find_user_by_email_async", errors=OPERATION_ERRORS)
+    async def find_user_by_email_async(self, email: str) -> Optional[Dict]:
+        """Find a user by email in HubSpot without blocking the event loop.
+        
+        Registrations accepted by any worker are in the local store, the
+        registration queue and the shared email filter, so those are
+        checked before a cached or filtered "not registered" is trusted.
+        """
+        hit, user = self.email_cache.lookup(email)
+        if hit and user is not None:
+            return user
+        
+        user, may_exist = await asyncio.to_thread(self._find_locally, email)
+        if user is not None:
+            self.email_cache.mark_registered(email, user)
+            return user
+        if hit or not may_exist or not self.async_client or self.circuit_open:
+            return None
+        
+        try:
+            contact = await self.async_client.search_contact_by_email(email)
+            user = contact_to_user(contact["id"], contact.get("properties", {})) if contact else None
+            self.email_cache.store(email, user)
+            return user
+        
+        except Exception as e:
+            OPERATION_ERRORS.inc("find_user_by_email_async")
             logger.error(f"Failed to search HubSpot contacts: {e}")
             return None
     
+    def _find_locally(self, email: str) -> Tuple[Optional[Dict], bool]:
+        """A user stored locally or waiting in the queue, and whether HubSpot may still have the email"""
+        # Stored locally while HubSpot was unavailable
+        local_user = self.local_users.find(email)
+        if local_user is not None:
+            return local_user, True
+        # Accepted by some worker but not flushed to HubSpot yet
+        if self.registration_queue is not None and self.registration_queue.contains(email):
+            return {"email": email}, True
+        if self.email_filter is None:
+            return None, True
+        return None, self.email_filter.might_contain(normalize_email(email), self.email_filter_max_age) is not False
+    
+    @OPERATION_SECONDS.time("seed_email_filter", errors=OPERATION_ERRORS)
+    async def seed_email_filter(self) -> None:
+        """Rebuild the shared email filter from the local stores and every HubSpot contact.
+        
+        Pages through the whole portal, so only call it while holding the
+        EMAIL_FILTER_LEASE; the lease is renewed as pages come in.
+        """
+        generation, bloom = await asyncio.to_thread(self.email_filter.begin_seed)
+        try:
+            # Registrations accepted from here on are added to the new filter as they happen
+            for email in await asyncio.to_thread(self._local_emails):
+                bloom.add(normalize_email(email))
+            seeded = 0
+            async for email in self.async_client.iter_contact_emails():
+                bloom.add(normalize_email(email))
+                seeded += 1
+                if seeded % 1000 == 0 and not await asyncio.to_thread(
+                    self.local_users.acquire_lease, EMAIL_FILTER_LEASE, self.worker, EMAIL_FILTER_LEASE_TTL
+                ):
+                    raise RuntimeError("lost the email filter lease")
+            await asyncio.to_thread(self.email_filter.finish_seed, generation, bloom)
+            logger.info(f"Email existence filter seeded with {seeded} HubSpot contacts")
+        except Exception as e:
+            await asyncio.to_thread(self.email_filter.abort_seed, generation)
+            OPERATION_ERRORS.inc("seed_email_filter")
+            logger.error(f"Failed to seed email existence filter: {e}")
+    
+    def _filter_due(self, interval: float) -> bool:
+        seeded_at = self.email_filter.seeded_at()
+        return seeded_at is None or time.time() - seeded_at >= interval
+    
+    async def refresh_email_filter(self, interval: float) -> None:
+        """Keep the shared email filter seeded.
+        
+        Every worker runs this, but the filter is only rebuilt when it is
+        missing or ``interval`` seconds old, by the worker holding the lease.
+        """
+        if self.email_filter is None:
+            return
+        while True:
+            try:
+                if (
+                    not self.circuit_open
+                    and await asyncio.to_thread(self._filter_due, interval)
+                    and await asyncio.to_thread(
+                        self.local_users.acquire_lease, EMAIL_FILTER_LEASE, self.worker, EMAIL_FILTER_LEASE_TTL
+                    )
+                ):
+                    try:
+                        # Another worker may have finished a rebuild just before
+                        if await asyncio.to_thread(self._filter_due, interval):
+                            await self.seed_email_filter()
+                    finally:
+                        await asyncio.to_thread(self.local_users.release_lease, EMAIL_FILTER_LEASE, self.worker)
+            except Exception as e:
+                logger.error(f"Failed to refresh the email filter: {e}")
+            await asyncio.sleep(min(interval, 60))
+    
+    def _local_emails(self):
+        """Emails of users stored by the local fallback or waiting in the registration queue"""
+        emails = self.local_users.emails()
+        if self.registration_queue is not None:
+            emails += self.registration_queue.emails()
+        return emails
+    
+    @OPERATION_SECONDS.time("store_locally", errors=OPERATION_ERRORS)
     def _store_locally(self, user: User) -> bool:
         """Fallback method to store user data locally"""
         try:
-            import json
-            local_file = "local_users.json"
-            
-            # Load existing data
-            users = []
-            if os.path.exists(local_file):
-                with open(local_file, 'r') as f:
-                    users = json.load(f)
-            
-            # Add new user
-            users.append(user.to_dict())
-            
-            # Save back
-            with open(local_file, 'w') as f:
-                json.dump(users, f, indent=2)
-            
+            self.local_users.add(user)
+            self._remember_email(user.email)
+            LOCAL_FALLBACKS.inc("stored")
             logger.info(f"User {user.email} stored locally")
             return True
-            
+        
         except Exception as e:
+            LOCAL_FALLBACKS.inc("failed")
+            OPERATION_ERRORS.inc("store_locally")
             logger.error(f"Failed to store user locally: {e}")
             return False
 
-# Singleton instance
-hubspot_service = HubSpotService()
\ No newline at end of file
+@functools.lru_cache(maxsize=None)
+def get_hubspot_service() -> HubSpotService:
+    """The shared instance, created on first use (the app's lifespan creates it at startup).
+    
+    Building it opens the local stores, so importing this module stays
+    free of side effects.
+    """
+    return HubSpotService()
@@ -0,0 +1,292 @@
+# backend/app/services/hubspot_client.py
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+from app.core.config import settings
+from app.models.user import User
+from app.services.resilience import CircuitBreaker, TokenBucket, backoff_delay
+
+if TYPE_CHECKING:
+    # Imported when the first client is built; httpx is slow to import
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+CONTACT_PROPERTIES = ["email", "firstname", "lastname", "phone", "vtb_learning_area", "vtb_registered_at"]
+
+def contact_properties(user: User) -> Dict[str, str]:
+    """HubSpot contact properties for a registered user"""
+    return {
+        "email": user.email,
+        "firstname": user.name.split()[0] if ' ' in user.name else user.name,
+        "lastname": ' '.join(user.name.split()[1:]) if ' ' in user.name else "",
+        "phone": user.phone_number,
+        "vtb_learning_area": user.learning_area,
+        "vtb_registered_at": user.registered_at.strftime("%Y-%m-%d %H:%M:%S UTC")
+    }
+
+def contact_to_user(contact_id: str, properties: Dict[str, Any]) -> Dict:
+    """Map a HubSpot contact back to the user dict returned by the API"""
+    return {
+        "email": properties.get("email"),
+        "name": f"{properties.get('firstname') or ''} {properties.get('lastname') or ''}".strip(),
+        "phoneNumber": properties.get("phone") or "",
+        "learningArea": properties.get("vtb_learning_area") or "",
+        "hubspotId": contact_id
+    }
+
+class HubSpotError(Exception):
+    """Raised for a failed HubSpot API call"""
+    
+    def __init__(self, status: Optional[int], message: str):
+        super().__init__(f"HubSpot API error ({status}): {message}")
+        self.status = status
+
+class CircuitOpenError(HubSpotError):
+    """Raised without calling HubSpot while the circuit breaker is open"""
+    
+    def __init__(self):
+        super().__init__(None, "circuit breaker open")
+
+class RateLimitedError(HubSpotError):
+    """Raised when the client-side rate limit cannot be met within the call's timeout"""
+    
+    def __init__(self):
+        super().__init__(429, "client-side rate limit reached")
+
+def is_retriable(error: HubSpotError) -> bool:
+    """Network errors, rate limiting and server errors are worth retrying"""
+    return error.status is None or error.status == 429 or error.status >= 500
+
+class AsyncHubSpotClient:
+    """Non-blocking HubSpot CRM v3 client.
+    
+    One pooled ``httpx.AsyncClient`` (keep-alive connections) is shared by
+    every request on the worker, concurrent calls are bounded by a
+    semaphore and every call has a hard timeout, so a slow CRM response
+    only ever delays the request that is waiting on it.
+    
+    Calls are paced by a token bucket sized to HubSpot's rate limit (search
+    has its own, stricter one), 429 and 5xx responses are retried with
+    jittered exponential backoff, and a circuit breaker fails calls fast
+    while HubSpot keeps failing.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.hubapi.com",
+        timeout: float = 5.0,
+        max_connections: int = 20,
+        max_concurrency: int = 10,
+        rate_limit: int = 100,
+        rate_period: float = 10.0,
+        search_rate_limit: int = 5,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 10.0,
+        breaker_failures: int = 5,
+        breaker_reset: float = 30.0,
+        transport: Optional["httpx.AsyncBaseTransport"] = None
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.max_concurrency = max_concurrency
+        self._rate_limiter = TokenBucket(rate_limit, rate_period)
+        self._search_rate_limiter = TokenBucket(search_rate_limit, 1.0)
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset)
+        # Replaces the network, e.g. with an in-process fake HubSpot in benchmarks
+        self.transport = transport
+        # Both bound to the loop that first sends a request; aclose() resets them
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+            
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+    
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+    
+    async def _take_token(self, search: bool) -> None:
+        """Wait for the rate limiters, failing at once if that would outlast the timeout"""
+        wait = self._rate_limiter.reserve(self.timeout)
+        if wait is None:
+            raise RateLimitedError()
+        if search:
+            search_wait = self._search_rate_limiter.reserve(self.timeout)
+            if search_wait is None:
+                self._rate_limiter.refund()
+                raise RateLimitedError()
+            wait = max(wait, search_wait)
+        if wait:
+            await asyncio.sleep(wait)
+    
+    async def _send(self, method: str, path: str, json: Any) -> "httpx.Response":
+        client = self._get_client()
+        async with self._semaphore:
+            return await client.request(method, path, json=json)
+    
+    async def request(self, method: str, path: str, json: Any = None, search: bool = False) -> Any:
+        """Send one API call and return the decoded JSON body (None for empty bodies)"""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError()
+        
+        import httpx
+        
+        attempt = 0
+        while True:
+            # Throttled locally, so HubSpot was never called: not retried, not a breaker failure
+            await self._take_token(search)
+            retry_after = None
+            try:
+                # Bound the whole call, including waiting for a concurrency slot and a pooled connection
+                response = await asyncio.wait_for(self._send(method, path, json), timeout=self.timeout)
+            except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                error = HubSpotError(None, f"{type(e).__name__}: {e}")
+            else:
+                if response.status_code < 400:
+                    self.breaker.record_success()
+                    return response.json() if response.content else None
+                error = HubSpotError(response.status_code, response.text[:500])
+                retry_after = response.headers.get("Retry-After")
+            
+            if not is_retriable(error):
+                # HubSpot answered; the request itself was rejected
+                self.breaker.record_success()
+                raise error
+            if attempt >= self.max_retries:
+                self.breaker.record_failure()
+                raise error
+            
+            delay = backoff_delay(attempt, self.retry_backoff, self.retry_backoff_max)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.retry_backoff_max))
+            logger.warning(f"Retrying HubSpot {method} {path} in {delay:.2f}s: {error}")
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    async def search_contact_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        body = {
+            "filterGroups": [
+                {"filters": [{"propertyName": "email", "operator": "EQ", "value": email}]}
+            ],
+            "properties": CONTACT_PROPERTIES,
+            "limit": 1,
+        }
+        result = await self.request("POST", "/crm/v3/objects/contacts/search", json=body, search=True)
+        results = result.get("results", []) if result else []
+        return results[0] if results else None
+    
+    async def create_contact(self, properties: Dict[str, str]) -> Dict[str, Any]:
+        return await self.request("POST", "/crm/v3/objects/contacts", json={"properties": properties})
+    
+    async def batch_create_contacts(self, inputs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Create up to 100 contacts in one call; returns the created contacts"""
+        body = {"inputs": [{"properties": properties} for properties in inputs]}
+        result = await self.request("POST", "/crm/v3/objects/contacts/batch/create", json=body)
+        return result.get("results", []) if result else []
+    
+    async def batch_read_contacts_by_email(self, emails: List[str]) -> List[Dict[str, Any]]:
+        """Look up to 100 contacts by email in one call; unknown emails are left out"""
+        body = {
+            "idProperty": "email",
+            "inputs": [{"id": email} for email in emails],
+            "properties": CONTACT_PROPERTIES,
+        }
+        result = await self.request("POST", "/crm/v3/objects/contacts/batch/read", json=body)
+        return result.get("results", []) if result else []
+    
+    async def iter_contacts(self, properties: List[str], page_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """Page through every contact in the portal with the given properties"""
+        after = None
+        while True:
+            path = f"/crm/v3/objects/contacts?limit={page_size}&properties={','.join(properties)}"
+            if after:
+                path += f"&after={after}"
+            result = await self.request("GET", path) or {}
+            for contact in result.get("results", []):
+                yield contact
+            after = result.get("paging", {}).get("next", {}).get("after")
+            if not after:
+                return
+    
+    async def search_contacts(
+        self, filters: List[Dict[str, Any]], properties: List[str], page_size: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Page through the contacts matching every one of ``filters`` with the search API.
+        
+        Search stops at 10,000 results per query, so each page asks for the
+        contacts after the last id seen instead of following the cursor.
+        """
+        last_id = None
+        while True:
+            page_filters = list(filters)
+            if last_id is not None:
+                page_filters.append({"propertyName": "hs_object_id", "operator": "GT", "value": last_id})
+            body = {
+                "filterGroups": [{"filters": page_filters}],
+                "sorts": [{"propertyName": "hs_object_id", "direction": "ASCENDING"}],
+                "properties": properties,
+                "limit": page_size,
+            }
+            result = await self.request("POST", "/crm/v3/objects/contacts/search", json=body, search=True) or {}
+            contacts = result.get("results", [])
+            for contact in contacts:
+                yield contact
+            if len(contacts) < page_size:
+                return
+            last_id = contacts[-1]["id"]
+    
+    async def iter_contact_emails(self, page_size: int = 100) -> AsyncIterator[str]:
+        """Page through every contact in the portal, yielding its email"""
+        async for contact in self.iter_contacts(["email"], page_size):
+            email = contact.get("properties", {}).get("email")
+            if email:
+                yield email
+    
+    async def add_to_list(self, list_id: str, contact_ids: List[str]) -> None:
+        await self.request("PUT", f"/crm/v3/lists/{list_id}/memberships/add", json=contact_ids)
+
+def create_async_client() -> Optional[AsyncHubSpotClient]:
+    """Build the shared client from settings, or None if HubSpot is not configured"""
+    if not settings.HUBSPOT_API_KEY:
+        return None
+    return AsyncHubSpotClient(
+        api_key=settings.HUBSPOT_API_KEY,
+        base_url=settings.HUBSPOT_BASE_URL,
+        timeout=settings.HUBSPOT_TIMEOUT,
+        max_connections=settings.HUBSPOT_MAX_CONNECTIONS,
+        max_concurrency=settings.HUBSPOT_MAX_CONCURRENCY,
+        rate_limit=settings.HUBSPOT_RATE_LIMIT,
+        rate_period=settings.HUBSPOT_RATE_PERIOD,
+        search_rate_limit=settings.HUBSPOT_SEARCH_RATE_LIMIT,
+        max_retries=settings.HUBSPOT_MAX_RETRIES,
+        retry_backoff=settings.HUBSPOT_RETRY_BACKOFF,
+        breaker_failures=settings.HUBSPOT_BREAKER_FAILURES,
+        breaker_reset=settings.HUBSPOT_BREAKER_RESET,
+    )
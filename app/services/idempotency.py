@@ -0,0 +1,55 @@
+# backend/app/services/idempotency.py
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Tuple
+from app.db.idempotency import IdempotencyStore
+
+# How often a retry polls for the outcome of a request still running elsewhere
+POLL_INTERVAL = 0.05
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request body, to spot a key reused for a different request"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+async def run_idempotent(
+    store: IdempotencyStore,
+    key: str,
+    fingerprint: str,
+    handler: Callable[[], Awaitable[Tuple[int, Any]]],
+    wait: float = 10.0
+) -> Tuple[int, Any]:
+    """Run ``handler`` at most once per idempotency key and return its ``(status_code, body)``.
+    
+    A repeated key replays the stored outcome. If the first request is
+    still running (possibly in another worker) the retry waits up to
+    ``wait`` seconds for it. Server errors are not stored, so the client
+    can retry them with the same key.
+    """
+    record = await asyncio.to_thread(store.claim, key, fingerprint)
+    if record is None:
+        try:
+            status_code, body = await handler()
+        except BaseException:
+            await asyncio.to_thread(store.release, key)
+            raise
+        if status_code >= 500:
+            await asyncio.to_thread(store.release, key)
+        else:
+            await asyncio.to_thread(store.complete, key, status_code, body)
+        return status_code, body
+    
+    deadline = time.monotonic() + wait
+    while True:
+        if record is None:
+            # The first request failed and released the key; let the client retry
+            return 409, {"detail": "A request with this Idempotency-Key failed; retry it"}
+        if record.fingerprint != fingerprint:
+            return 422, {"detail": "Idempotency-Key was already used for a different request"}
+        if record.status_code is not None:
+            return record.status_code, record.body
+        if time.monotonic() >= deadline:
+            return 409, {"detail": "A request with this Idempotency-Key is still in progress"}
+        await asyncio.sleep(POLL_INTERVAL)
+        record = await asyncio.to_thread(store.get, key)
@@ -0,0 +1,96 @@
+# backend/app/services/learning_content.py
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+from app.api.deps import EncodedResponse, encode_api_response
+from app.models.learning import AreaSnapshot, LearningContent
+from app.schemas.learning import ModuleView
+from app.services.content_bundle import response_key
+
+logger = logging.getLogger(__name__)
+
+class ContentResponseCache:
+    """Pre-encoded API responses for learning areas, modules and lessons.
+    
+    Responses are stored on the snapshot they were encoded from and are
+    encoded by ``warm`` before a loaded or reloaded snapshot is published,
+    so requests never see a snapshot whose responses are still missing.
+    Unchanged modules of a reloaded area reuse the responses of the
+    previous snapshot. Areas loaded from a compiled bundle are served from
+    the bundle's pre-encoded bodies.
+    """
+    
+    def _get(self, snapshot: AreaSnapshot, kind: str, name: str) -> EncodedResponse:
+        if snapshot.bundle is not None:
+            bundled = snapshot.bundle.response(snapshot.area, response_key(kind, name))
+            if bundled is not None:
+                return bundled
+        
+        encoded = snapshot.responses.get((kind, name))
+        if encoded is None:
+            # Not warmed, e.g. warming failed: serve it uncompressed rather than
+            # compress on the event loop
+            encoded = encode_api_response(self._source(snapshot, kind, name), precompress=False)
+        return encoded
+    
+    def area_response(self, snapshot: AreaSnapshot, view: ModuleView = ModuleView.full) -> EncodedResponse:
+        return self._get(snapshot, "area", view.value)
+    
+    def module_response(self, snapshot: AreaSnapshot, module_id: str) -> EncodedResponse:
+        return self._get(snapshot, "module", module_id)
+    
+    def lesson_response(self, snapshot: AreaSnapshot, lesson_id: str) -> EncodedResponse:
+        return self._get(snapshot, "lesson", lesson_id)
+    
+    @staticmethod
+    def _source(snapshot: AreaSnapshot, kind: str, name: str) -> Any:
+        if kind == "area":
+            return snapshot.summaries if name == ModuleView.summary.value else snapshot.modules
+        if kind == "lesson":
+            return snapshot.lesson_index[name]
+        return snapshot.module_index[name]
+    
+    @staticmethod
+    def _version(snapshot: AreaSnapshot, kind: str, name: str) -> Optional[Any]:
+        """Token that changes whenever the response ``(kind, name)`` of ``snapshot`` would"""
+        versions = snapshot.module_versions
+        if kind == "area":
+            area_version = tuple(versions.get(summary.get("id")) for summary in snapshot.summaries)
+            return None if None in area_version else area_version
+        if kind == "lesson":
+            return versions.get(snapshot.lesson_modules.get(name))
+        return versions.get(name)
+    
+    def warm(self, content: LearningContent, snapshots: Dict[str, Optional[AreaSnapshot]]) -> None:
+        """Encode the responses of snapshots that are about to be published"""
+        for area, snapshot in snapshots.items():
+            if snapshot is None or snapshot.bundle is not None:
+                # Removed, or served straight from the bundle
+                continue
+            previous = content.get_loaded_snapshot(area)
+            keys = [("area", view.value) for view in ModuleView]
+            keys.extend(("module", module_id) for module_id in snapshot.module_index)
+            keys.extend(("lesson", lesson_id) for lesson_id in snapshot.lesson_index)
+            for kind, name in keys:
+                reused = previous.responses.get((kind, name)) if previous is not None else None
+                version = self._version(snapshot, kind, name)
+                if reused is not None and version is not None and version == self._version(previous, kind, name):
+                    snapshot.responses[(kind, name)] = reused
+                else:
+                    snapshot.responses[(kind, name)] = encode_api_response(self._source(snapshot, kind, name))
+
+async def watch_content(content: LearningContent, interval: float) -> None:
+    """Poll the content directory and hot-swap areas whose files changed.
+    
+    Scanning and the content listeners (response cache, search index, ...)
+    run in a worker thread; requests keep being served from the current
+    snapshots until the new ones are swapped in.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            changed = await asyncio.to_thread(content.refresh)
+            if changed:
+                logger.info(f"Reloaded learning content for: {', '.join(changed)}")
+        except Exception as e:
+            logger.error(f"Error reloading learning content: {e}")
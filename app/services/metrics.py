@@ -0,0 +1,277 @@
+# backend/app/services/metrics.py
+"""Metrics in the Prometheus data model, aggregated across uvicorn workers.
+
+Every worker updates in-memory counters, gauges and histograms (a dict
+update under a lock, cheap enough for every request) and a background task
+publishes the running totals to a SQLite file shared by all workers. A
+scrape publishes the answering worker's totals and renders the sum over all
+workers, so /metrics reports the same numbers whichever worker serves it
+(other workers' totals are at most one publish interval old).
+"""
+import asyncio
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.db.metrics import MetricsStore, Sample
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+def _labels_key(pairs: Sequence[Tuple[str, str]]) -> str:
+    return json.dumps(pairs, separators=(",", ":"))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _exposition_order(sample: Sample) -> Tuple[str, int, float]:
+    """Sort key grouping a family's samples by label set: buckets by increasing ``le``, then _sum, then _count"""
+    _, _, name, labels, _ = sample
+    pairs = json.loads(labels)
+    le = next((value for label, value in pairs if label == "le"), None)
+    labels_key = _labels_key([pair for pair in pairs if pair[0] != "le"])
+    if le is not None:
+        return labels_key, 0, float(le)
+    return labels_key, 2 if name.endswith("_count") else 1 if name.endswith("_sum") else 0, 0.0
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+class _Metric:
+    kind = ""
+    
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = registry._lock
+        self._values: Dict[Tuple[str, ...], float] = {}
+        registry.register(self)
+    
+    def _key(self, labelvalues: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labelvalues}")
+        return labelvalues
+    
+    def samples(self) -> List[Sample]:
+        return [
+            (self.name, self.kind, self.name, _labels_key(list(zip(self.labelnames, key))), value)
+            for key, value in self._values.items()
+        ]
+
+class Counter(_Metric):
+    """Monotonic total, e.g. ``requests.inc("GET", "/health")``"""
+    kind = "counter"
+    
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    """Current value; only live workers are summed"""
+    kind = "gauge"
+    
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+    
+    def set(self, value: float, *labelvalues: str) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    """Distribution of observed values, e.g. ``latency.observe(0.12, "GET", "/health")``"""
+    kind = "histogram"
+    
+    def __init__(self, registry, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._observations: Dict[Tuple[str, ...], List[float]] = {}
+    
+    def observe(self, value: float, *labelvalues: str) -> None:
+        key = self._key(labelvalues)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            observations = self._observations.get(key)
+            if observations is None:
+                observations = self._observations[key] = [0.0] * (len(self.buckets) + 2)
+            observations[index] += 1
+            observations[-1] += value
+    
+    def time(self, *labelvalues: str, errors: Optional[Counter] = None) -> Callable:
+        """Decorator observing the duration of a function or coroutine function.
+        
+        Exceptions it raises are also counted in ``errors`` with the same labels.
+        """
+        def decorate(function):
+            if asyncio.iscoroutinefunction(function):
+                @functools.wraps(function)
+                async def timed_coroutine(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await function(*args, **kwargs)
+                    except Exception:
+                        if errors is not None:
+                            errors.inc(*labelvalues)
+                        raise
+                    finally:
+                        self.observe(time.perf_counter() - start, *labelvalues)
+                return timed_coroutine
+            
+            @functools.wraps(function)
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                except Exception:
+                    if errors is not None:
+                        errors.inc(*labelvalues)
+                    raise
+                finally:
+                    self.observe(time.perf_counter() - start, *labelvalues)
+            return timed
+        return decorate
+    
+    def samples(self) -> List[Sample]:
+        samples = []
+        for key, observations in self._observations.items():
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), observations):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                samples.append((self.name, self.kind, f"{self.name}_bucket", _labels_key(pairs + [("le", le)]), cumulative))
+            samples.append((self.name, self.kind, f"{self.name}_sum", _labels_key(pairs), observations[-1]))
+            samples.append((self.name, self.kind, f"{self.name}_count", _labels_key(pairs), cumulative))
+        return samples
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return Counter(self, name, documentation, labelnames)
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return Gauge(self, name, documentation, labelnames)
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return Histogram(self, name, documentation, labelnames, buckets)
+    
+    def samples(self) -> List[Sample]:
+        """This worker's totals"""
+        with self._lock:
+            return [sample for metric in self._metrics.values() for sample in metric.samples()]
+    
+    def render(self, samples: Sequence[Sample]) -> str:
+        """Prometheus text exposition of ``samples``, grouped by metric family"""
+        families: Dict[str, List[Sample]] = {}
+        for sample in samples:
+            families.setdefault(sample[0], []).append(sample)
+        
+        lines = []
+        for family in sorted(families):
+            family_samples = families[family]
+            metric = self._metrics.get(family)
+            if metric is not None:
+                lines.append(f"# HELP {family} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {family} {family_samples[0][1]}")
+            for _, _, name, labels, value in sorted(family_samples, key=_exposition_order):
+                pairs = json.loads(labels)
+                label_text = ",".join(f'{label}="{_escape(str(label_value))}"' for label, label_value in pairs)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if pairs else f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+class MetricsPublisher:
+    """Publishes this worker's totals to the shared store every ``interval`` seconds.
+    
+    The store at ``path`` is opened by ``start``; without one (no path, or
+    not started yet) a scrape only sees this worker.
+    """
+    
+    def __init__(self, registry: MetricsRegistry, path: Optional[Path], interval: float = 5.0):
+        self.registry = registry
+        self.path = path
+        self.store: Optional[MetricsStore] = None
+        self.interval = interval
+        self.worker = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # Workers silent this long are gone; their counters are folded into the retired totals
+        self.retire_after = max(3600.0, 10 * interval)
+        self._task: Optional[asyncio.Task] = None
+    
+    def _publish(self) -> None:
+        self.store.publish(self.worker, self.registry.samples())
+    
+    async def exposition(self) -> str:
+        """Totals across every worker in the text exposition format"""
+        if self.store is None:
+            return self.registry.render(self.registry.samples())
+        await asyncio.to_thread(self._publish)
+        samples = await asyncio.to_thread(self.store.collect, 3 * self.interval)
+        return self.registry.render(samples)
+    
+    def start(self) -> None:
+        if self.path is None:
+            return
+        self.store = MetricsStore(self.path)
+        self._task = asyncio.create_task(self.run())
+    
+    async def run(self) -> None:
+        try:
+            retired = await asyncio.to_thread(self.store.retire, self.retire_after)
+            if retired:
+                logger.info(f"Folded metrics of {retired} stopped workers into the retired totals")
+        except Exception as e:
+            logger.error(f"Failed to retire stale metrics: {e}")
+        while True:
+            try:
+                await asyncio.to_thread(self._publish)
+            except Exception as e:
+                logger.error(f"Failed to publish metrics: {e}")
+            await asyncio.sleep(self.interval)
+    
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Leave the final totals behind for the retired counters
+        await asyncio.to_thread(self._publish)
+        self.store.close()
+        self.store = None
+
+registry = MetricsRegistry()
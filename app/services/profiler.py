@@ -0,0 +1,200 @@
+# backend/app/services/profiler.py
+import asyncio
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_sequence = itertools.count()
+
+class RequestProfile:
+    """Call-stack samples of one in-flight request"""
+    
+    def __init__(self, task: asyncio.Task, root: FrameType, loop_thread: int):
+        # Sorts by start time; unique across workers
+        self.id = f"{int(time.time() * 1000)}-{os.getpid()}-{next(_sequence):06d}"
+        self.task = task
+        # Frame of the middleware call that handles the request; stacks are cut here
+        self.root = root
+        self.loop_thread = loop_thread
+        self.started = time.perf_counter()
+        self.samples: Counter = Counter()
+        # Tasks started while handling the request (e.g. a single-flight call)
+        self.children: List[asyncio.Task] = []
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    try:
+        filename = os.path.relpath(filename)
+    except ValueError:
+        pass
+    if filename.startswith(".."):
+        # Library code: the package path is enough
+        filename = filename.split("site-packages" + os.sep)[-1]
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames in the collapsed format
+    return f"{name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+def _task_frames(
+    task: asyncio.Task,
+    top_frame: Optional[FrameType],
+    seen: Set[asyncio.Task]
+) -> Tuple[List[FrameType], Optional[str]]:
+    """Frames of ``task``, outermost first, and what it is suspended on (None while it runs).
+    
+    The task's await chain gives the stack while it is suspended; while it
+    runs, the event loop thread's live frames above the innermost
+    coroutine are added. Tasks passed through are added to ``seen``.
+    """
+    frames: List[FrameType] = []
+    running = False
+    seen.add(task)
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        if isinstance(awaitable, asyncio.Task):
+            seen.add(awaitable)
+            awaitable = awaitable.get_coro()
+            continue
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            return frames, f"<await {type(awaitable).__name__}>"
+        frames.append(frame)
+        running = getattr(awaitable, "cr_running", False) or getattr(awaitable, "gi_running", False)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    
+    if running and frames and top_frame is not None:
+        live = []
+        frame = top_frame
+        while frame is not None and frame is not frames[-1]:
+            live.append(frame)
+            frame = frame.f_back
+        if frame is not None:
+            frames.extend(reversed(live))
+    return frames, None
+
+def task_stacks(profile: RequestProfile, top_frame: Optional[FrameType]) -> List[str]:
+    """Collapsed stacks of a request at this instant.
+    
+    While the request waits on something other than a coroutine, tasks it
+    started are sampled below its stack, each one that is still pending
+    and not already part of another sampled await chain.
+    """
+    seen: Set[asyncio.Task] = set()
+    frames, leaf = _task_frames(profile.task, top_frame, seen)
+    if profile.root in frames:
+        frames = frames[frames.index(profile.root):]
+    stack = ";".join(_frame_label(frame) for frame in frames)
+    if leaf is None:
+        return [stack]
+    
+    stacks = []
+    for child in list(profile.children):
+        if child.done() or child in seen:
+            continue
+        child_frames, child_leaf = _task_frames(child, top_frame, seen)
+        child_stack = ";".join([stack] + [_frame_label(frame) for frame in child_frames])
+        stacks.append(f"{child_stack};{child_leaf}" if child_leaf else child_stack)
+    return stacks or [f"{stack};{leaf}"]
+
+class RequestProfiler:
+    """Wall-clock sampling profiler for selected requests.
+    
+    While at least one request is being profiled, a background thread
+    samples the stack of each one every ``interval`` seconds, including
+    where it is suspended (an awaited HubSpot call shows up as time spent
+    awaiting it) and the tasks it started, which a task factory installed
+    for the duration links to the request. Finished profiles are written in the collapsed-stack
+    format (``frame;frame;frame count``, readable by speedscope and
+    flamegraph.pl) to ``directory``, which keeps the newest ``max_files``.
+    Requests that are not profiled never touch the profiler.
+    """
+    
+    def __init__(self, directory: Path, max_files: int = 200, interval: float = 0.001):
+        self.directory = directory
+        self.max_files = max_files
+        self.interval = interval
+        self._active: Dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def begin(self, root: FrameType) -> RequestProfile:
+        """Start sampling the current task; ``root`` is the caller's frame"""
+        profile = RequestProfile(asyncio.current_task(), root, threading.get_ident())
+        loop = asyncio.get_running_loop()
+        if getattr(loop.get_task_factory(), "profiler", None) is not self:
+            loop.set_task_factory(self._task_factory(loop.get_task_factory()))
+        with self._lock:
+            self._active[id(profile)] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+                self._thread.start()
+        return profile
+    
+    def end(self, profile: RequestProfile) -> float:
+        """Stop sampling ``profile``; returns its wall time in seconds"""
+        with self._lock:
+            self._active.pop(id(profile), None)
+            idle = not self._active
+        loop = asyncio.get_running_loop()
+        factory = loop.get_task_factory()
+        if idle and getattr(factory, "profiler", None) is self:
+            loop.set_task_factory(factory.previous)
+        return time.perf_counter() - profile.started
+    
+    def _task_factory(self, previous):
+        """Task factory that records tasks created by profiled requests (or their tasks)"""
+        def factory(loop, coro, **kwargs):
+            task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+            parent = asyncio.current_task(loop)
+            if parent is not None:
+                with self._lock:
+                    for profile in self._active.values():
+                        if parent is profile.task or parent in profile.children:
+                            profile.children.append(task)
+            return task
+        factory.profiler = self
+        factory.previous = previous
+        return factory
+    
+    def _sample(self) -> None:
+        while True:
+            with self._lock:
+                profiles = list(self._active.values())
+                if not profiles:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for profile in profiles:
+                try:
+                    stacks = task_stacks(profile, frames.get(profile.loop_thread))
+                except Exception:
+                    # The task moved on while it was being walked
+                    continue
+                for stack in stacks:
+                    profile.samples[stack] += 1
+            del frames
+            time.sleep(self.interval)
+    
+    def write(self, profile: RequestProfile, method: str, route: str, elapsed: float) -> Path:
+        """Save a finished profile, tagged by route, and drop the oldest beyond ``max_files``"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = self.directory / f"{profile.id}-{method}-{slug}-{int(elapsed * 1000)}ms.collapsed"
+        with open(path, "w") as f:
+            for stack, count in profile.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        
+        profiles = sorted(self.directory.glob("*.collapsed"))
+        for stale in profiles[:max(0, len(profiles) - self.max_files)]:
+            stale.unlink(missing_ok=True)
+        return path
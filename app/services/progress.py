@@ -0,0 +1,101 @@
+# backend/app/services/progress.py
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from app.db.progress import ProgressStore, merge_progress
+from app.schemas.learning import ProgressUpdate
+
+logger = logging.getLogger(__name__)
+
+def progress_delta(update: ProgressUpdate) -> dict:
+    """The change described by one progress update, in the stored progress shape"""
+    delta = {"lastAccessedAt": datetime.utcnow().isoformat()}
+    if update.moduleId:
+        delta["currentModule"] = update.moduleId
+        if update.completed:
+            delta["completedModules"] = [update.moduleId]
+        if update.quizScore is not None:
+            delta["quizScores"] = {update.moduleId: update.quizScore}
+    return delta
+
+class ProgressWriter:
+    """Coalesces progress updates in memory and writes them in batches.
+    
+    Updates are merged per user and area as they arrive, so a burst of
+    clicks costs one row write, and every ``interval`` seconds (or once
+    ``max_pending`` users are waiting) all pending rows are written in a
+    single transaction. Reads merge the pending updates over the stored
+    progress, so a user always sees their own latest update.
+    """
+    
+    def __init__(self, store: ProgressStore, interval: float = 0.5, max_pending: int = 1000):
+        self.store = store
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        self._flushing: Dict[Tuple[str, str], dict] = {}
+        # Bound to the running loop, so created by start()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+    
+    def record(self, update: ProgressUpdate) -> None:
+        key = (update.userId, update.learningArea)
+        self._pending[key] = merge_progress(self._pending.get(key), progress_delta(update))
+        if len(self._pending) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def get(self, user_id: str, learning_area: Optional[str] = None) -> Dict[str, dict]:
+        """Progress of a user keyed by learning area, including updates not written yet"""
+        progress = await asyncio.to_thread(self.store.get, user_id, learning_area)
+        for pending in (self._flushing, self._pending):
+            for (pending_user, area), delta in pending.items():
+                if pending_user == user_id and (learning_area is None or area == learning_area):
+                    progress[area] = merge_progress(progress.get(area), delta)
+        return progress
+    
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        self._flushing, self._pending = self._pending, {}
+        try:
+            return await asyncio.to_thread(
+                self.store.apply, [(user_id, area, delta) for (user_id, area), delta in self._flushing.items()]
+            )
+        except BaseException:
+            # Keep the batch for the next flush, ahead of anything recorded since
+            for key, delta in self._flushing.items():
+                newer = self._pending.get(key)
+                self._pending[key] = merge_progress(delta, newer) if newer else delta
+            raise
+        finally:
+            self._flushing = {}
+    
+    def start(self) -> None:
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+    
+    async def run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write progress updates: {e}")
+    
+    async def stop(self) -> None:
+        """Stop the background loop and write what is still pending"""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        self._wakeup = None
+        await self.flush()
@@ -0,0 +1,150 @@
+# backend/app/services/reconciler.py
+import asyncio
+import logging
+import os
+import uuid
+from collections import Counter
+from typing import Dict, List, Tuple
+from app.core.config import settings
+from app.db.local_users import LocalUserStore
+from app.models.user import User
+from app.services.email_cache import normalize_email
+from app.services.hubspot_client import AsyncHubSpotClient, HubSpotError, contact_properties, is_retriable
+from app.services.resilience import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = "hubspot_reconcile"
+
+class LocalUserReconciler:
+    """Copies users stored locally during a HubSpot outage into HubSpot.
+    
+    The local store is read in id order from a checkpoint. Each window of
+    ``batch_size * concurrency`` users is deduplicated by email, checked
+    against HubSpot with batch read-by-email and the missing contacts are
+    created with batch create, ``concurrency`` batches at a time. The
+    checkpoint only moves past a window once all of its batches are done,
+    so an interrupted run resumes where it stopped; re-sending part of a
+    window is harmless because existing contacts are skipped.
+    
+    The lease that keeps other workers out is renewed after every window,
+    so it lasts as long as the pass however large the backlog is.
+    """
+    
+    def __init__(
+        self,
+        store: LocalUserStore,
+        client: AsyncHubSpotClient,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        lease_ttl: float = 300
+    ):
+        self.store = store
+        self.client = client
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.lease_ttl = lease_ttl
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    
+    async def run_once(self) -> Dict[str, int]:
+        """Reconcile everything stored since the checkpoint; returns per-outcome counts"""
+        stats = Counter(checked=0, existing=0, created=0, failed=0)
+        after = await asyncio.to_thread(self.store.get_checkpoint, CHECKPOINT)
+        while True:
+            rows = await asyncio.to_thread(self.store.read_after, after, self.batch_size * self.concurrency)
+            if not rows:
+                return dict(stats)
+            
+            # Latest record per email; the store is append-only and may hold repeats
+            users: Dict[str, dict] = {}
+            for _, user in rows:
+                if user.get("email"):
+                    users[normalize_email(user["email"])] = user
+            pending = list(users.values())
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            
+            for result in await asyncio.gather(*(push_users(self.client, batch) for batch in batches)):
+                stats.update(result)
+            after = rows[-1][0]
+            await asyncio.to_thread(self.store.set_checkpoint, CHECKPOINT, after)
+            logger.info(f"Reconciled local users up to #{after}: {dict(stats)}")
+            if not await asyncio.to_thread(self.store.acquire_lease, CHECKPOINT, self.owner, self.lease_ttl):
+                raise RuntimeError("Reconciliation lease was taken over by another worker")
+    
+    async def run(self, interval: float) -> None:
+        """Reconcile every ``interval`` seconds in whichever worker holds the lease"""
+        while True:
+            try:
+                if (
+                    self.client.breaker.state != CircuitBreaker.OPEN
+                    and await asyncio.to_thread(self.store.acquire_lease, CHECKPOINT, self.owner, self.lease_ttl)
+                ):
+                    await self.run_once()
+            except HubSpotError as e:
+                logger.warning(f"Reconciliation stopped, will resume from the checkpoint: {e}")
+            except Exception as e:
+                logger.error(f"Reconciliation failed: {e}")
+            await asyncio.sleep(interval)
+
+async def push_users(client: AsyncHubSpotClient, users: List[dict]) -> Dict[str, int]:
+    """Create the contacts for up to 100 users that HubSpot does not have yet.
+    
+    ``users`` are dicts in the ``User.to_dict`` format with distinct
+    emails. Existing contacts are found with one batch read by email and
+    the rest are created with one batch create. Raises HubSpotError for
+    failures worth retrying; returns per-outcome counts.
+    """
+    contacts = await client.batch_read_contacts_by_email([user["email"] for user in users])
+    existing = {normalize_email(contact.get("properties", {}).get("email") or "") for contact in contacts}
+    missing = [user for user in users if normalize_email(user["email"]) not in existing]
+    stats = {"checked": len(users), "existing": len(users) - len(missing), "created": 0, "failed": 0}
+    if not missing:
+        return stats
+    
+    properties, invalid = _contact_properties(missing)
+    stats["failed"] += invalid
+    if not properties:
+        return stats
+    try:
+        created = await client.batch_create_contacts(properties)
+        contact_ids = [contact.get("id") for contact in created]
+    except HubSpotError as e:
+        if is_retriable(e):
+            raise
+        # One duplicate or invalid contact fails the whole batch
+        contact_ids, failed = await _create_individually(client, properties)
+        stats["failed"] += failed
+    stats["created"] += len(contact_ids)
+    await _add_to_list(client, contact_ids)
+    return stats
+
+def _contact_properties(users: List[dict]) -> Tuple[List[Dict[str, str]], int]:
+    properties, invalid = [], 0
+    for user in users:
+        try:
+            properties.append(contact_properties(User.from_dict(user)))
+        except (KeyError, ValueError) as e:
+            logger.error(f"Skipping malformed user {user.get('email')}: {e}")
+            invalid += 1
+    return properties, invalid
+
+async def _create_individually(client: AsyncHubSpotClient, properties: List[Dict[str, str]]) -> Tuple[List[str], int]:
+    contact_ids, failed = [], 0
+    for contact in properties:
+        try:
+            contact_ids.append((await client.create_contact(contact))["id"])
+        except HubSpotError as e:
+            if is_retriable(e):
+                raise
+            if e.status != 409:
+                logger.error(f"HubSpot rejected user {contact['email']}: {e}")
+                failed += 1
+    return contact_ids, failed
+
+async def _add_to_list(client: AsyncHubSpotClient, contact_ids: List[str]) -> None:
+    if not settings.HUBSPOT_LIST_ID or not contact_ids:
+        return
+    try:
+        await client.add_to_list(settings.HUBSPOT_LIST_ID, contact_ids)
+    except HubSpotError as e:
+        logger.error(f"Failed to add contacts to list: {e}")
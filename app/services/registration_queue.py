@@ -0,0 +1,190 @@
+# backend/app/services/registration_queue.py
+import asyncio
+import logging
+import time
+from typing import List, Optional
+from app.core.config import settings
+from app.db.registration_queue import QueuedRegistration, RegistrationQueue
+from app.models.user import User
+from app.services.hubspot_client import (
+    AsyncHubSpotClient, CircuitOpenError, HubSpotError, contact_properties, is_retriable
+)
+from app.services.resilience import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Longest delay between retries of a failing registration
+MAX_RETRY_DELAY = 300
+
+class RegistrationFlusher:
+    """Background writer that pushes queued registrations to HubSpot in batches.
+    
+    Registrations are flushed through the batch-create endpoint in groups
+    of up to ``batch_size``, at least every ``interval`` seconds or as soon
+    as a full batch is waiting. Transient failures are retried with
+    exponential backoff; registrations that keep failing (or that HubSpot
+    rejects) are handed to ``store_locally`` so no signup is lost.
+    """
+    
+    def __init__(
+        self,
+        queue: RegistrationQueue,
+        client: AsyncHubSpotClient,
+        store_locally,
+        batch_size: int = 100,
+        interval: float = 1.0,
+        max_attempts: int = 5,
+        lease: float = 60.0
+    ):
+        self.queue = queue
+        self.client = client
+        self.store_locally = store_locally
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.lease = lease
+        # Bound to the running loop, so created by start()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._queued_since_flush = 0
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+    
+    def notify(self) -> None:
+        """Called after each enqueue; wakes the flusher once a full batch is waiting"""
+        self._queued_since_flush += 1
+        if self._queued_since_flush >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+    
+    def start(self) -> None:
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+    
+    async def run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush registration queue: {e}")
+    
+    async def stop(self, timeout: float) -> None:
+        """Stop the background loop, then drain what is due within ``timeout`` seconds"""
+        deadline = time.monotonic() + timeout
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._task = None
+        self._wakeup = None
+        await self.drain(max(0.0, deadline - time.monotonic()))
+    
+    async def flush(self) -> int:
+        """Send every registration that is currently due; returns how many were processed"""
+        self._queued_since_flush = 0
+        processed = 0
+        while True:
+            # Leave the queue alone while HubSpot is known to be down
+            if self.client.breaker.state == CircuitBreaker.OPEN:
+                return processed
+            batch = await asyncio.to_thread(self.queue.claim, self.batch_size, self.lease)
+            if not batch:
+                return processed
+            try:
+                await self._send_batch(batch)
+            except asyncio.CancelledError:
+                # Don't leave the batch leased until the lease expires
+                self.queue.release([item.id for item in batch])
+                raise
+            processed += len(batch)
+    
+    async def drain(self, timeout: float) -> None:
+        """Flush what is due before shutdown, giving up after ``timeout`` seconds"""
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.wait_for(self.flush(), timeout=max(0.0, deadline - time.monotonic()))
+                wait = await asyncio.to_thread(self.queue.next_available_in)
+                if wait is None or time.monotonic() + wait >= deadline:
+                    break
+                await asyncio.sleep(wait)
+        except asyncio.TimeoutError:
+            pass
+        pending = await asyncio.to_thread(self.queue.pending)
+        if pending:
+            logger.warning(f"{pending} registrations left in the queue; they will be sent on next start")
+    
+    async def _send_batch(self, batch: List[QueuedRegistration]) -> None:
+        try:
+            created = await self.client.batch_create_contacts(
+                [contact_properties(User.from_dict(item.user)) for item in batch]
+            )
+        except CircuitOpenError:
+            await asyncio.to_thread(self.queue.release, [item.id for item in batch])
+            return
+        except HubSpotError as e:
+            if is_retriable(e):
+                logger.warning(f"HubSpot batch create failed, will retry: {e}")
+                await self._retry_or_store(batch)
+            else:
+                # One duplicate or invalid contact fails the whole batch
+                await self._send_individually(batch)
+            return
+        
+        created_ids = {
+            (contact.get("properties", {}).get("email") or "").lower(): contact.get("id")
+            for contact in created
+        }
+        done = [item for item in batch if item.email in created_ids]
+        missing = [item for item in batch if item.email not in created_ids]
+        await asyncio.to_thread(self.queue.complete, [item.id for item in done])
+        await self._add_to_list([created_ids[item.email] for item in done])
+        logger.info(f"Flushed {len(done)} registrations to HubSpot")
+        if missing:
+            await self._send_individually(missing)
+    
+    async def _send_individually(self, batch: List[QueuedRegistration]) -> None:
+        for position, item in enumerate(batch):
+            try:
+                contact = await self.client.create_contact(contact_properties(User.from_dict(item.user)))
+                await self._add_to_list([contact["id"]])
+            except CircuitOpenError:
+                # Not an attempt: hand the rest back for when HubSpot recovers
+                await asyncio.to_thread(self.queue.release, [rest.id for rest in batch[position:]])
+                return
+            except HubSpotError as e:
+                if e.status == 409:
+                    logger.warning(f"Contact with email {item.email} already exists in HubSpot")
+                elif is_retriable(e):
+                    await self._retry_or_store([item])
+                    continue
+                else:
+                    logger.error(f"HubSpot rejected registration for {item.email}: {e}")
+                    await asyncio.to_thread(self.store_locally, User.from_dict(item.user))
+            await asyncio.to_thread(self.queue.complete, [item.id])
+    
+    async def _retry_or_store(self, batch: List[QueuedRegistration]) -> None:
+        for item in batch:
+            if item.attempts + 1 >= self.max_attempts:
+                logger.error(f"Giving up on HubSpot for {item.email} after {self.max_attempts} attempts")
+                await asyncio.to_thread(self.store_locally, User.from_dict(item.user))
+                await asyncio.to_thread(self.queue.complete, [item.id])
+            else:
+                delay = min(MAX_RETRY_DELAY, self.interval * 2 ** (item.attempts + 1))
+                await asyncio.to_thread(self.queue.retry_later, [item.id], delay)
+    
+    async def _add_to_list(self, contact_ids: List[str]) -> None:
+        if not settings.HUBSPOT_LIST_ID or not contact_ids:
+            return
+        try:
+            await self.client.add_to_list(settings.HUBSPOT_LIST_ID, contact_ids)
+        except HubSpotError as e:
+            logger.error(f"Failed to add contacts to list: {e}")
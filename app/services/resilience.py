@@ -0,0 +1,97 @@
+# backend/app/services/resilience.py
+import asyncio
+import math
+import random
+import time
+from typing import Optional
+
+class TokenBucket:
+    """Client-side rate limiter allowing ``capacity`` calls per ``period`` seconds.
+    
+    Tokens refill continuously, so a burst of up to ``capacity`` calls goes
+    straight through and sustained traffic is spread evenly over the window.
+    Callers reserve a token up front and then sleep until it is due, so
+    the wait is known immediately and a caller that cannot afford it can
+    give up without sleeping at all.
+    """
+    
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def reserve(self, max_wait: float = math.inf) -> Optional[float]:
+        """Take a token; returns the seconds to wait before using it, or None if that exceeds ``max_wait``"""
+        self._refill()
+        wait = max(0.0, (1 - self._tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        self._tokens -= 1
+        return wait
+    
+    def refund(self) -> None:
+        """Give back a reserved token that was not used"""
+        self._tokens = min(self.capacity, self._tokens + 1)
+    
+    async def acquire(self, max_wait: float = math.inf) -> bool:
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+class CircuitBreaker:
+    """Stops calling a dependency after repeated failures.
+    
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls are refused without touching the network. Once ``reset_timeout``
+    seconds have passed it is half-open: one trial call is let through,
+    closing the breaker if it succeeds and re-opening it if it fails.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+    
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+    
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.HALF_OPEN:
+            # Let this one call through as the trial; others wait for its outcome
+            # (or for another reset_timeout if it never reports back)
+            self._opened_at = time.monotonic()
+            return True
+        return state == self.CLOSED
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = self.CLOSED
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == self.OPEN or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given retry (0-based)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
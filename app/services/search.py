@@ -0,0 +1,168 @@
+# backend/app/services/search.py
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import heapq
+import math
+import re
+from app.models.learning import AreaSnapshot, LearningContent
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to with you your".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Title matches count this many times towards term frequency
+TITLE_WEIGHT = 3
+SNIPPET_RADIUS = 80
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+@dataclass(frozen=True)
+class LessonDocument:
+    area: str
+    module_id: str
+    module_title: str
+    lesson_id: str
+    lesson_title: str
+    text: str
+    length: int
+    term_freqs: Dict[str, int]
+
+def build_lesson_documents(area: str, module: dict) -> List[LessonDocument]:
+    """Tokenize every lesson of a module into a searchable document"""
+    documents = []
+    for lesson in module.get("lessons", []):
+        title_tokens = tokenize(lesson.get("title", ""))
+        body = [lesson.get("content", ""), module.get("title", "")]
+        for example in lesson.get("codeExamples") or []:
+            body.extend(example.get(key) or "" for key in ("title", "description", "code"))
+        
+        term_freqs: Dict[str, int] = {}
+        for token in tokenize(" ".join(body)):
+            term_freqs[token] = term_freqs.get(token, 0) + 1
+        for token in title_tokens:
+            term_freqs[token] = term_freqs.get(token, 0) + TITLE_WEIGHT
+        
+        documents.append(LessonDocument(
+            area=area,
+            module_id=module.get("id"),
+            module_title=module.get("title", ""),
+            lesson_id=lesson.get("id"),
+            lesson_title=lesson.get("title", ""),
+            text=lesson.get("content", ""),
+            length=sum(term_freqs.values()),
+            term_freqs=term_freqs
+        ))
+    return documents
+
+class AreaSearchIndex:
+    """Immutable inverted index over the lessons of one learning area"""
+    
+    def __init__(self, documents: List[LessonDocument]):
+        self.documents = documents
+        self.total_length = sum(document.length for document in documents)
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, document in enumerate(documents):
+            for term, tf in document.term_freqs.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+
+class SearchIndex:
+    """BM25 full-text search over lesson titles, content and code examples.
+    
+    Each area has its own immutable index that is rebuilt and swapped in
+    when the area changes. Tokenized lessons are cached per module and
+    version (file signature or bundle etag), so a rebuild only decodes and
+    re-tokenizes modules whose content actually changed.
+    """
+    
+    def __init__(self):
+        self._areas: Dict[str, AreaSearchIndex] = {}
+        self._module_docs: Dict[Tuple[str, str], Tuple[Optional[str], List[LessonDocument]]] = {}
+    
+    def update(self, content: LearningContent, snapshots: Dict[str, Optional[AreaSnapshot]]) -> None:
+        """(Re)index areas from the snapshots about to be published (None drops an area)"""
+        for area, snapshot in snapshots.items():
+            if snapshot is None:
+                self._areas.pop(area, None)
+                for key in [key for key in self._module_docs if key[0] == area]:
+                    del self._module_docs[key]
+                continue
+            
+            documents = []
+            module_ids = set()
+            # Summaries are in module order and, unlike bundled modules, need no decoding
+            for summary in snapshot.summaries:
+                key = (area, summary.get("id"))
+                module_ids.add(key)
+                version = snapshot.module_versions.get(key[1])
+                cached = self._module_docs.get(key)
+                if cached is None or version is None or cached[0] != version:
+                    cached = (version, build_lesson_documents(area, snapshot.module_index[key[1]]))
+                    self._module_docs[key] = cached
+                documents.extend(cached[1])
+            
+            for key in [key for key in self._module_docs if key[0] == area and key not in module_ids]:
+                del self._module_docs[key]
+            self._areas[area] = AreaSearchIndex(documents)
+    
+    def clear(self) -> None:
+        self._areas = {}
+        self._module_docs.clear()
+    
+    def search(self, query: str, area: Optional[str] = None, limit: int = 10) -> List[dict]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        areas = self._areas
+        if area is not None:
+            indexes = [areas[area]] if area in areas else []
+        else:
+            indexes = list(areas.values())
+        if not terms or not indexes:
+            return []
+        
+        doc_count = sum(len(index.documents) for index in indexes)
+        if doc_count == 0:
+            return []
+        avg_length = sum(index.total_length for index in indexes) / doc_count
+        
+        scores: Dict[Tuple[int, int], float] = {}
+        for term in terms:
+            df = sum(len(index.postings.get(term, ())) for index in indexes)
+            if df == 0:
+                continue
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for index_id, index in enumerate(indexes):
+                for doc_id, tf in index.postings.get(term, ()):
+                    length = index.documents[doc_id].length
+                    norm = tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+                    key = (index_id, doc_id)
+                    scores[key] = scores.get(key, 0.0) + idf * norm
+        
+        results = []
+        for (index_id, doc_id), score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            document = indexes[index_id].documents[doc_id]
+            results.append({
+                "area": document.area,
+                "moduleId": document.module_id,
+                "moduleTitle": document.module_title,
+                "lessonId": document.lesson_id,
+                "lessonTitle": document.lesson_title,
+                "score": round(score, 4),
+                "snippet": make_snippet(document.text, terms)
+            })
+        return results
+
+def make_snippet(text: str, terms: List[str]) -> str:
+    """Cut a short excerpt around the first occurrence of any query term"""
+    match = re.search(r"\b(" + "|".join(re.escape(term) for term in terms) + r")", text, re.IGNORECASE)
+    start = max(0, match.start() - SNIPPET_RADIUS) if match else 0
+    end = min(len(text), (match.end() if match else 0) + SNIPPET_RADIUS)
+    snippet = " ".join(text[start:end].split())
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(text):
+        snippet += "..."
+    return snippet
@@ -0,0 +1,27 @@
+# backend/app/services/single_flight.py
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+    
+    Callers that arrive while a call for their key is running wait for it
+    and get its result (or exception). The call is shielded, so it carries
+    on for the remaining callers if the one that started it is cancelled.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(future)
+    
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# backend/scripts/benchmark.py
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Allow running as `python scripts/benchmark.py` from the backend root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx
+from fake_hubspot import FakeHubSpot, create_fake_hubspot
+from load_test import percentile
+
+AREAS = ["devops", "devsecops", "data-engineering", "fullstack", "ai-ml"]
+WORDS = (
+    "container pipeline deploy cluster service build image registry secret policy scan stream "
+    "batch model feature query schema index cache latency throughput replica node volume network"
+).split()
+
+def synthetic_module(rng: random.Random, area: str, order: int, lessons: int) -> dict:
+    """A module shaped like the real content, with ``lessons`` markdown lessons and a quiz"""
+    module_id = f"{area}-bench-{order:03d}"
+    
+    def text(words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+    
+    return {
+        "id": module_id,
+        "title": f"{text(3).title()} {order}",
+        "description": text(20),
+        "order": order,
+        "estimatedMinutes": rng.randint(20, 90),
+        "lessons": [
+            {
+                "id": f"{module_id}-{lesson}",
+                "title": text(4).title(),
+                "type": "text",
+                "content": "\n\n".join(f"## {text(3).title()}\n\n{text(120)}" for _ in range(4)),
+                "codeExamples": [{"language": "bash", "code": f"docker run {rng.choice(WORDS)}:latest"}],
+            }
+            for lesson in range(1, lessons + 1)
+        ],
+        "quiz": {
+            "id": f"{module_id}-quiz",
+            "questions": [
+                {
+                    "id": f"{module_id}-q{question}",
+                    "question": text(10) + "?",
+                    "options": [text(4) for _ in range(4)],
+                    "correctAnswer": rng.randrange(4),
+                    "explanation": text(25),
+                }
+                for question in range(1, 6)
+            ],
+            "passingScore": 4,
+        },
+    }
+
+def write_catalogue(content_path: Path, modules: int, lessons: int, seed: int) -> Dict[str, List[str]]:
+    """Write ``modules`` synthetic module files spread over the learning areas; returns module ids per area"""
+    rng = random.Random(seed)
+    module_ids: Dict[str, List[str]] = {area: [] for area in AREAS}
+    for index in range(modules):
+        area = AREAS[index % len(AREAS)]
+        module = synthetic_module(rng, area, len(module_ids[area]) + 1, lessons)
+        area_path = content_path / area
+        area_path.mkdir(parents=True, exist_ok=True)
+        with open(area_path / f"module-{module['order']:03d}-{module['id']}.json", "w") as f:
+            json.dump(module, f)
+        module_ids[area].append(module["id"])
+    return module_ids
+
+async def measure(fn: Callable, iterations: int, warmup: int) -> dict:
+    """Time ``fn`` (sync or async) ``iterations`` times after ``warmup`` untimed calls"""
+    for _ in range(warmup):
+        result = fn()
+        if inspect.isawaitable(result):
+            await result
+    
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        if inspect.isawaitable(result):
+            await result
+        timings.append(time.perf_counter() - start)
+    
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        "iterations": iterations,
+        "mean_us": round(mean * 1e6, 2),
+        "p50_us": round(percentile(timings, 50) * 1e6, 2),
+        "p95_us": round(percentile(timings, 95) * 1e6, 2),
+        "p99_us": round(percentile(timings, 99) * 1e6, 2),
+        "ops_per_sec": round(1 / mean, 1) if mean else 0.0,
+    }
+
+async def run(args, content_path: Path, module_ids: Dict[str, List[str]]) -> Dict[str, dict]:
+    # Settings are read at import time; the environment is prepared by main()
+    from app.main import app
+    from app.api.deps import create_api_response, encode_api_response
+    from app.models.learning import LearningContent
+    from app.core.config import settings
+    from app.services.hubspot import get_hubspot_service
+    
+    logging.getLogger().setLevel(args.log_level.upper())
+    # Stub HubSpot with the in-process fake, without network latency
+    fake = FakeHubSpot(latency=0.0, jitter=0.0)
+    get_hubspot_service().async_client.transport = httpx.ASGITransport(app=create_fake_hubspot(fake))
+    
+    area = AREAS[0]
+    rng = random.Random(args.seed)
+    warm_content = LearningContent(content_path, settings.CONTENT_BUNDLE_PATH)
+    warm_content.load_all()
+    area_modules = list(warm_content.get_modules_for_area(area))
+    
+    def cold_load():
+        # A fresh instance parses (or maps) the area again
+        return LearningContent(content_path, settings.CONTENT_BUNDLE_PATH).get_modules_for_area(area)
+    
+    def encode_json(data):
+        # The JSON half of encode_api_response, without the precompressed variants
+        return json.dumps(create_api_response(success=True, data=data), ensure_ascii=False, separators=(",", ":"))
+    
+    run_id = uuid.uuid4().hex[:8]
+    counter = iter(range(10 ** 9))
+    
+    def new_email() -> str:
+        return f"bench-{run_id}-{next(counter)}@example.com"
+    
+    results: Dict[str, dict] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend") as client:
+            benchmarks = [
+                ("content.get_modules_for_area.cold", cold_load, args.cold_iterations),
+                ("content.get_modules_for_area.warm", lambda: warm_content.get_modules_for_area(area), args.iterations),
+                (
+                    "content.get_module_by_id.warm",
+                    lambda: warm_content.get_module_by_id(area, rng.choice(module_ids[area])),
+                    args.iterations
+                ),
+                ("serialize.area_full.json", lambda: encode_json(area_modules), args.cold_iterations),
+                ("serialize.area_full.encoded", lambda: encode_api_response(area_modules), args.cold_iterations),
+                ("serialize.module.json", lambda: encode_json(rng.choice(area_modules)), args.iterations),
+                ("serialize.module.encoded", lambda: encode_api_response(rng.choice(area_modules)), args.iterations),
+                ("http.areas", lambda: client.get("/api/v1/learning/areas"), args.iterations),
+                ("http.area_modules", lambda: client.get(f"/api/v1/learning/{area}/modules"), args.iterations),
+                (
+                    "http.module",
+                    lambda: client.get(f"/api/v1/learning/{area}/modules/{rng.choice(module_ids[area])}"),
+                    args.iterations
+                ),
+                ("http.check_email", lambda: client.get(f"/api/v1/users/check-email/{new_email()}"), args.iterations),
+                ("http.register", lambda: client.post("/api/v1/users/register", json={
+                    "name": "Bench Marker",
+                    "email": new_email(),
+                    "phoneNumber": "5551234567",
+                    "learningArea": area,
+                }), args.iterations),
+            ]
+            for name, fn, iterations in benchmarks:
+                if args.only and not any(pattern in name for pattern in args.only):
+                    continue
+                results[name] = await measure(fn, iterations, max(1, iterations // 10))
+                print(f"{name:<36} {results[name]['p50_us']:>12.1f} us p50", file=sys.stderr)
+    return results
+
+def compare(result: dict, baseline: dict, threshold: float) -> List[str]:
+    """Annotate ``result`` with the p50 change against ``baseline``; returns the regressions"""
+    regressions = []
+    for name, current in result["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("p50_us"):
+            continue
+        change = current["p50_us"] / previous["p50_us"] - 1
+        current["change"] = round(change, 4)
+        if change > threshold:
+            regressions.append(f"{name}: p50 {previous['p50_us']}us -> {current['p50_us']}us ({change:+.0%})")
+    return regressions
+
+def print_report(result: dict) -> None:
+    config = result["config"]
+    print(f"{config['modules']} modules x {config['lessons']} lessons, bundle={config['bundle']}")
+    print(f"{'benchmark':<36} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'ops/s':>10} {'change':>8}")
+    for name, stats in result["benchmarks"].items():
+        change = f"{stats['change']:+.1%}" if "change" in stats else ""
+        print(
+            f"{name:<36} {stats['p50_us']:>10} {stats['p95_us']:>10} {stats['p99_us']:>10} "
+            f"{stats['ops_per_sec']:>10} {change:>8}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark content serving and registration in-process")
+    parser.add_argument("--modules", type=int, default=500, help="Synthetic modules, spread over the learning areas")
+    parser.add_argument("--lessons", type=int, default=5, help="Lessons per synthetic module")
+    parser.add_argument("--iterations", type=int, default=1000, help="Timed calls per fast benchmark")
+    parser.add_argument("--cold-iterations", type=int, default=10, help="Timed calls per cold load/encode benchmark")
+    parser.add_argument("--bundle", action="store_true", help="Serve the catalogue from a compiled bundle")
+    parser.add_argument("--only", nargs="*", help="Only run benchmarks whose name contains one of these")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Fail if a p50 is this fraction slower than the baseline")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="error", help="Log level of the in-process backend")
+    args = parser.parse_args()
+    
+    data_dir = Path(tempfile.mkdtemp(prefix="vtb-bench-"))
+    try:
+        content_path = data_dir / "content"
+        module_ids = write_catalogue(content_path, args.modules, args.lessons, args.seed)
+        bundle_path = data_dir / "modules.bundle"
+        if args.bundle:
+            from app.models.learning import LearningContent, summarize_module
+            from app.services.content_bundle import write_bundle
+            
+            content = LearningContent(content_path)
+            content.load_all()
+            write_bundle(
+                {area: content.get_modules_for_area(area) for area in content.get_areas()},
+                bundle_path,
+                summarize_module,
+                {area: content.get_snapshot(area).answer_keys for area in content.get_areas()}
+            )
+        
+        # Settings are read at import time, so configure the app before importing it
+        os.environ.update({
+            "HUBSPOT_API_KEY": "benchmark",
+            "HUBSPOT_RATE_LIMIT": "1000000000",
+            "HUBSPOT_SEARCH_RATE_LIMIT": "1000000000",
+            "CONTENT_BASE_PATH": str(content_path),
+            "CONTENT_BUNDLE_PATH": str(bundle_path),
+            "CONTENT_RELOAD_INTERVAL": "0",
+            "EMAIL_FILTER_REFRESH_INTERVAL": "0",
+            "LOCAL_USERS_RECONCILE_INTERVAL": "0",
+            "METRICS_PUBLISH_INTERVAL": "0",
+            "PROFILE_SAMPLE_RATE": "0",
+            "PROFILE_DEBUG_TOKEN": "",
+            "REGISTRATION_QUEUE_PATH": str(data_dir / "registration_queue.db"),
+            "LOCAL_USERS_PATH": str(data_dir / "local_users.db"),
+            "LOCAL_USERS_IMPORT_PATH": str(data_dir / "local_users.json"),
+            "IDEMPOTENCY_PATH": str(data_dir / "idempotency.db"),
+            "PROGRESS_DB_PATH": str(data_dir / "progress.db"),
+            "METRICS_DB_PATH": str(data_dir / "metrics.db"),
+        })
+        benchmarks = asyncio.run(run(args, content_path, module_ids))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    
+    result = {
+        "version": 1,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"modules": args.modules, "lessons": args.lessons, "bundle": args.bundle},
+        "benchmarks": benchmarks,
+    }
+    
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print(f"Warning: baseline was run with {baseline.get('config')}, this run with {result['config']}")
+        regressions = compare(result, baseline, args.threshold)
+    
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
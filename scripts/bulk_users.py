@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# backend/scripts/bulk_users.py
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Allow running as `python scripts/bulk_users.py` from the backend root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import ValidationError
+from app.models.user import User
+from app.schemas.user import UserRegistration
+from app.services.email_cache import normalize_email
+from app.services.hubspot_client import (
+    CONTACT_PROPERTIES, AsyncHubSpotClient, HubSpotError, contact_to_user, create_async_client
+)
+from app.services.reconciler import push_users
+
+BATCH_SIZE = 100  # HubSpot's batch API limit
+EXPORT_FIELDS = ["name", "email", "phoneNumber", "learningArea", "registeredAt", "hubspotId"]
+
+def iter_rows(path: Path, skip: int = 0) -> Iterator[Tuple[int, Dict]]:
+    """Stream ``(row_number, row)`` pairs from a CSV or JSONL file, skipping the first ``skip`` rows"""
+    with open(path, newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row_number, row in enumerate(rows, start=1):
+            if row_number > skip:
+                yield row_number, row
+
+def parse_registered_at(value: Optional[str]) -> datetime:
+    """Accept both our ISO timestamps and the format stored in HubSpot"""
+    if not value:
+        return datetime.utcnow()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S UTC")
+
+def load_checkpoint(path: Path) -> Dict:
+    if not path.exists():
+        return {"rows": 0, "stats": {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_checkpoint(path: Path, rows: int, stats: Counter) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"rows": rows, "stats": dict(stats)}, f)
+    os.replace(tmp_path, path)
+
+async def push_window(client: AsyncHubSpotClient, users: List[dict]) -> Counter:
+    """Dedupe one window by email and push it as concurrent batches"""
+    unique = list({normalize_email(user["email"]): user for user in users}.values())
+    batches = [unique[i:i + BATCH_SIZE] for i in range(0, len(unique), BATCH_SIZE)]
+    stats = Counter(duplicates=len(users) - len(unique))
+    for result in await asyncio.gather(*(push_users(client, batch) for batch in batches)):
+        stats.update(result)
+    return stats
+
+async def import_users(args) -> int:
+    source = Path(args.file)
+    checkpoint_path = Path(args.checkpoint or f"{source}.checkpoint")
+    rejects_path = Path(args.rejects or f"{source}.rejects.jsonl")
+    if args.restart and not args.dry_run:
+        for path in (checkpoint_path, rejects_path):
+            if path.exists():
+                path.unlink()
+    # A dry run validates the whole file and leaves the checkpoint and rejects of real runs alone
+    state = {"rows": 0, "stats": {}} if args.dry_run else load_checkpoint(checkpoint_path)
+    stats = Counter(state["stats"])
+    if state["rows"]:
+        print(f"Resuming after row {state['rows']}")
+    
+    client = None if args.dry_run else create_async_client()
+    if client is None and not args.dry_run:
+        print("HUBSPOT_API_KEY is not set; use --dry-run to only validate the file")
+        return 1
+    
+    window_size = BATCH_SIZE * args.concurrency
+    window: List[dict] = []
+    rows_done = state["rows"]
+    started = time.monotonic()
+    try:
+        with contextlib.nullcontext(sys.stdout) if args.dry_run else open(rejects_path, "a") as rejects:
+            for row_number, row in iter_rows(source, skip=state["rows"]):
+                rows_done = row_number
+                try:
+                    registration = UserRegistration.model_validate(row)
+                    registered_at = parse_registered_at(row.get("registeredAt"))
+                except (ValidationError, ValueError) as e:
+                    stats["rejected"] += 1
+                    rejects.write(json.dumps({"row": row_number, "data": row, "error": str(e)}, default=str) + "\n")
+                    continue
+                
+                window.append(User(
+                    name=registration.name,
+                    email=registration.email,
+                    phone_number=registration.phoneNumber,
+                    learning_area=registration.learningArea,
+                    registered_at=registered_at
+                ).to_dict())
+                if len(window) >= window_size:
+                    if client is not None:
+                        stats.update(await push_window(client, window))
+                        save_checkpoint(checkpoint_path, rows_done, stats)
+                    window = []
+                    print(f"{rows_done} rows, {rows_done / (time.monotonic() - started):.0f} rows/s: {dict(stats)}")
+            
+            if client is not None:
+                if window:
+                    stats.update(await push_window(client, window))
+                save_checkpoint(checkpoint_path, rows_done, stats)
+    except HubSpotError as e:
+        print(f"Stopped by a HubSpot error, re-run to resume from the last checkpoint: {e}")
+        return 1
+    finally:
+        if client is not None:
+            await client.aclose()
+    
+    print(f"Done: {rows_done} rows: {dict(stats)}")
+    if stats["rejected"] and not args.dry_run:
+        print(f"Rejected rows were written to {rejects_path}")
+    return 0
+
+async def export_users(args) -> int:
+    client = create_async_client()
+    if client is None:
+        print("HUBSPOT_API_KEY is not set")
+        return 1
+    
+    target = Path(args.file)
+    exported = 0
+    try:
+        with open(target, "w", newline="") as f:
+            writer = None
+            if target.suffix.lower() == ".csv":
+                writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+                writer.writeheader()
+            if args.all:
+                contacts = client.iter_contacts(CONTACT_PROPERTIES)
+            else:
+                # Only contacts created by the platform carry vtb_* properties; let HubSpot filter them
+                contacts = client.search_contacts(
+                    [{"propertyName": "vtb_learning_area", "operator": "HAS_PROPERTY"}], CONTACT_PROPERTIES
+                )
+            async for contact in contacts:
+                properties = contact.get("properties", {})
+                row = contact_to_user(contact["id"], properties)
+                row["registeredAt"] = properties.get("vtb_registered_at") or ""
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    f.write(json.dumps(row) + "\n")
+                exported += 1
+    except HubSpotError as e:
+        print(f"Export failed after {exported} contacts: {e}")
+        return 1
+    finally:
+        await client.aclose()
+    
+    print(f"Exported {exported} contacts to {target}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import and export of registered users")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    
+    # import command
+    import_parser = subparsers.add_parser("import", help="Register users from a CSV or JSONL file")
+    import_parser.add_argument("file", help="CSV (with a header row) or JSONL file of registrations")
+    import_parser.add_argument("--concurrency", type=int, default=4, help="Batches of 100 in flight")
+    import_parser.add_argument("--checkpoint", help="Progress file (default: <file>.checkpoint)")
+    import_parser.add_argument("--rejects", help="Where to write invalid rows (default: <file>.rejects.jsonl)")
+    import_parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    import_parser.add_argument("--dry-run", action="store_true", help="Only validate the file; invalid rows are printed")
+    
+    # export command
+    export_parser = subparsers.add_parser("export", help="Export platform contacts from HubSpot")
+    export_parser.add_argument("file", help="Output file; .csv for CSV, anything else for JSONL")
+    export_parser.add_argument("--all", action="store_true", help="Include contacts without vtb_* properties")
+    
+    args = parser.parse_args()
+    
+    if args.command == "import":
+        sys.exit(asyncio.run(import_users(args)))
+    elif args.command == "export":
+        sys.exit(asyncio.run(export_users(args)))
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# backend/scripts/check_startup.py
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter: the framework is imported first, so the rest is the app's own cost
+PROBE = """
+import json, sys, threading, time
+start = time.perf_counter()
+import fastapi, pydantic, starlette
+framework = time.perf_counter() - start
+import app.main
+total = time.perf_counter() - start
+print(json.dumps({
+    "framework": framework,
+    "total": total,
+    "modules": sorted(sys.modules),
+    "threads": [thread.name for thread in threading.enumerate() if thread is not threading.main_thread()],
+}))
+"""
+
+# Only needed once a request or the lifespan uses them
+DEFAULT_FORBIDDEN = ["hubspot", "httpx", "urllib3"]
+
+def probe(env: dict) -> dict:
+    """Import the app once in a new interpreter; returns timings, loaded modules and the import-time log"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_ROOT,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing the app failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["importtime"] = completed.stderr
+    return result
+
+def slowest_app_modules(importtime_log: str, count: int):
+    """(cumulative us, module) of the slowest ``app`` modules in a -X importtime log"""
+    modules = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name == "app" or name.startswith("app."):
+            try:
+                modules.append((int(cumulative), name))
+            except ValueError:
+                continue
+    return sorted(modules, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that importing the app is fast and side-effect free"
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time; the median is checked")
+    parser.add_argument("--budget-ms", type=float, default=200.0,
+                        help="Maximum import time of the app on top of fastapi and pydantic")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN,
+                        help="Packages that must not be imported by importing the app")
+    parser.add_argument("--top", type=int, default=10, help="Slowest app modules to list")
+    args = parser.parse_args()
+    
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="vtb-startup-") as data_dir:
+        env = dict(os.environ)
+        env.update({
+            "REGISTRATION_QUEUE_PATH": str(Path(data_dir) / "registration_queue.db"),
+            "LOCAL_USERS_PATH": str(Path(data_dir) / "local_users.db"),
+            "LOCAL_USERS_IMPORT_PATH": str(Path(data_dir) / "local_users.json"),
+            "EMAIL_FILTER_PATH": str(Path(data_dir) / "email_filter.db"),
+            "IDEMPOTENCY_PATH": str(Path(data_dir) / "idempotency.db"),
+            "PROGRESS_DB_PATH": str(Path(data_dir) / "progress.db"),
+            "METRICS_DB_PATH": str(Path(data_dir) / "metrics.db"),
+            "PROFILE_DIR": str(Path(data_dir) / "profiles"),
+        })
+        runs = [probe(env) for _ in range(args.runs)]
+        # Stores are opened by the lifespan, never by the import
+        created = sorted(str(path.relative_to(data_dir)) for path in Path(data_dir).rglob("*"))
+        if created:
+            failures.append(f"importing the app created {', '.join(created)}")
+    
+    app_ms = [(run["total"] - run["framework"]) * 1000 for run in runs]
+    total_ms = [run["total"] * 1000 for run in runs]
+    median_run = runs[app_ms.index(sorted(app_ms)[len(app_ms) // 2])]
+    print(f"Import time over {args.runs} runs (median, min-max):")
+    print(f"  framework  {statistics.median([run['framework'] * 1000 for run in runs]):8.1f} ms")
+    print(f"  app        {statistics.median(app_ms):8.1f} ms  ({min(app_ms):.1f}-{max(app_ms):.1f}), "
+          f"budget {args.budget_ms:.0f} ms")
+    print(f"  total      {statistics.median(total_ms):8.1f} ms")
+    print("Slowest app modules (cumulative):")
+    for cumulative, name in slowest_app_modules(median_run["importtime"], args.top):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    
+    if statistics.median(app_ms) > args.budget_ms:
+        failures.append(f"app import took {statistics.median(app_ms):.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    loaded = [
+        package for package in args.forbid
+        if any(module == package or module.startswith(package + ".") for module in runs[0]["modules"])
+    ]
+    if loaded:
+        failures.append(f"importing the app loaded {', '.join(loaded)}")
+    if runs[0]["threads"]:
+        failures.append(f"importing the app started threads: {', '.join(runs[0]['threads'])}")
+    
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# backend/scripts/fake_hubspot.py
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+class FakeHubSpot:
+    """In-memory stand-in for the parts of the HubSpot CRM API the backend uses.
+    
+    Every call sleeps for ``latency`` +/- ``jitter`` seconds, fails with a
+    500 with probability ``error_rate`` and, when ``rate_limit`` is set,
+    answers 429 once more than ``rate_limit`` calls arrive within
+    ``rate_period`` seconds (search is limited to ``search_rate_limit``
+    per second, like the real API).
+    """
+    
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_period: float = 10.0,
+        search_rate_limit: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_period = rate_period
+        self.search_rate_limit = search_rate_limit
+        self.contacts: Dict[str, dict] = {}
+        self.lists: Dict[str, set] = {}
+        self.calls: Counter = Counter()
+        self.responses: Counter = Counter()
+        self._window: List[float] = []
+        self._search_window: List[float] = []
+        self._next_id = 1
+    
+    def _over_limit(self, window: List[float], limit: Optional[int], period: float) -> bool:
+        if limit is None:
+            return False
+        now = time.monotonic()
+        while window and window[0] <= now - period:
+            window.pop(0)
+        if len(window) >= limit:
+            return True
+        window.append(now)
+        return False
+    
+    async def gate(self, name: str, search: bool = False) -> Optional[Response]:
+        """Simulate latency, rate limiting and failures; returns an error response or None"""
+        self.calls[name] += 1
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if self._over_limit(self._window, self.rate_limit, self.rate_period) or (
+            search and self._over_limit(self._search_window, self.search_rate_limit, 1.0)
+        ):
+            self.responses[429] += 1
+            return JSONResponse(
+                {"status": "error", "category": "RATE_LIMITS", "message": "You have reached your secondly limit."},
+                status_code=429,
+                headers={"Retry-After": "1"}
+            )
+        if random.random() < self.error_rate:
+            self.responses[500] += 1
+            return JSONResponse({"status": "error", "message": "Internal error"}, status_code=500)
+        return None
+    
+    def create(self, properties: dict) -> Optional[dict]:
+        """Create a contact, or return None if the email is taken"""
+        email = (properties.get("email") or "").lower()
+        if email in self.contacts:
+            return None
+        contact = {"id": str(self._next_id), "properties": dict(properties, email=email)}
+        self._next_id += 1
+        self.contacts[email] = contact
+        return contact
+    
+    def conflict(self, email: str) -> JSONResponse:
+        self.responses[409] += 1
+        existing = self.contacts[email.lower()]["id"]
+        return JSONResponse(
+            {"status": "error", "category": "CONFLICT", "message": f"Contact already exists. Existing ID: {existing}"},
+            status_code=409
+        )
+
+def filter_matches(contact: dict, search_filter: dict) -> bool:
+    """The subset of HubSpot's search filters used by the scripts: EQ, GT (on ids) and HAS_PROPERTY"""
+    name = search_filter.get("propertyName")
+    value = contact["id"] if name == "hs_object_id" else contact["properties"].get(name)
+    operator = search_filter.get("operator")
+    if operator == "HAS_PROPERTY":
+        return value not in (None, "")
+    if value is None:
+        return False
+    if operator == "EQ":
+        return str(value).lower() == str(search_filter.get("value", "")).lower()
+    if operator == "GT":
+        return int(value) > int(search_filter["value"])
+    return False
+
+def create_fake_hubspot(hubspot: FakeHubSpot) -> FastAPI:
+    app = FastAPI(title="Fake HubSpot")
+    
+    @app.post("/crm/v3/objects/contacts/search")
+    async def search(request: Request):
+        error = await hubspot.gate("search", search=True)
+        if error:
+            return error
+        body = await request.json()
+        groups = [group.get("filters", []) for group in body.get("filterGroups", [])]
+        if len(groups) == 1 and len(groups[0]) == 1 and groups[0][0].get("propertyName") == "email":
+            # Email lookups by the app: answered from the index
+            email = groups[0][0].get("value", "").lower()
+            results = [hubspot.contacts[email]] if email in hubspot.contacts else []
+        else:
+            results = [
+                contact for contact in hubspot.contacts.values()
+                if any(all(filter_matches(contact, f) for f in filters) for filters in groups)
+            ]
+            if body.get("sorts"):
+                results.sort(key=lambda contact: int(contact["id"]))
+        results = results[:body.get("limit", 10)]
+        return {"total": len(results), "results": results}
+    
+    @app.post("/crm/v3/objects/contacts", status_code=201)
+    async def create(request: Request):
+        error = await hubspot.gate("create")
+        if error:
+            return error
+        properties = (await request.json()).get("properties", {})
+        contact = hubspot.create(properties)
+        if contact is None:
+            return hubspot.conflict(properties["email"])
+        return contact
+    
+    @app.post("/crm/v3/objects/contacts/batch/create", status_code=201)
+    async def batch_create(request: Request):
+        error = await hubspot.gate("batch_create")
+        if error:
+            return error
+        inputs = (await request.json()).get("inputs", [])
+        # Like HubSpot, one duplicate fails the whole batch
+        for item in inputs:
+            email = (item.get("properties", {}).get("email") or "").lower()
+            if email in hubspot.contacts:
+                return hubspot.conflict(email)
+        return {"status": "COMPLETE", "results": [hubspot.create(item.get("properties", {})) for item in inputs]}
+    
+    @app.post("/crm/v3/objects/contacts/batch/read")
+    async def batch_read(request: Request):
+        error = await hubspot.gate("batch_read")
+        if error:
+            return error
+        body = await request.json()
+        results = [
+            hubspot.contacts[item["id"].lower()]
+            for item in body.get("inputs", [])
+            if item.get("id", "").lower() in hubspot.contacts
+        ]
+        return {"status": "COMPLETE", "results": results}
+    
+    @app.get("/crm/v3/objects/contacts")
+    async def list_contacts(limit: int = 100, after: int = 0):
+        error = await hubspot.gate("list")
+        if error:
+            return error
+        contacts = list(hubspot.contacts.values())[after:after + limit]
+        result = {"results": contacts}
+        if after + limit < len(hubspot.contacts):
+            result["paging"] = {"next": {"after": str(after + limit)}}
+        return result
+    
+    @app.put("/crm/v3/lists/{list_id}/memberships/add")
+    async def add_to_list(list_id: str, request: Request):
+        error = await hubspot.gate("list_add")
+        if error:
+            return error
+        contact_ids = await request.json()
+        hubspot.lists.setdefault(list_id, set()).update(contact_ids)
+        return {"recordIdsAdded": contact_ids, "recordIdsMissing": []}
+    
+    @app.get("/__stats")
+    async def stats():
+        return {
+            "contacts": len(hubspot.contacts),
+            "calls": dict(hubspot.calls),
+            "errorResponses": {str(status): count for status, count in hubspot.responses.items()},
+        }
+    
+    return app
+
+def add_fake_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean seconds per HubSpot call")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Uniform +/- seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with a 500")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Calls per --rate-period before 429s")
+    parser.add_argument("--rate-period", type=float, default=10.0)
+    parser.add_argument("--search-rate-limit", type=int, default=None, help="Search calls per second before 429s")
+
+def fake_from_arguments(args: argparse.Namespace) -> FakeHubSpot:
+    return FakeHubSpot(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_period=args.rate_period,
+        search_rate_limit=args.search_rate_limit
+    )
+
+def main():
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the HubSpot CRM API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+    
+    print(f"Point the backend at it with HUBSPOT_BASE_URL=http://{args.host}:{args.port} HUBSPOT_API_KEY=fake")
+    uvicorn.run(create_fake_hubspot(fake_from_arguments(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
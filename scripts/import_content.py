@@ -4,9 +4,15 @@
 import argparse
 import json
 import os
+import sys
 from pathlib import Path
 import shutil
 
+# Allow running as `python scripts/import_content.py` from the backend root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_BUNDLE_PATH = Path("./content/modules.bundle")
+
 def create_module_structure(learning_area):
     """Create directory structure for a learning area"""
     base_path = Path("./content/modules")
@@ -48,12 +54,14 @@ def import_module(file_path, learning_area):
         with open(source_path, 'r', encoding='utf-8') as f:
             module_data = json.load(f)
         
-        # Basic validation
-        required_fields = ['id', 'title', 'description', 'order', 'lessons']
-        for field in required_fields:
-            if field not in module_data:
-                print(f"Error: Required field '{field}' missing in module JSON")
-                return False
+        # Validate against the Module schema served by the API
+        from pydantic import ValidationError
+        from app.models.learning import validate_module
+        try:
+            module_data = validate_module(module_data)
+        except ValidationError as e:
+            print(f"Error: {file_path} is not a valid module:\n{e}")
+            return False
         
         # Create target filename
         module_id = module_data['id']
@@ -67,7 +75,7 @@ def import_module(file_path, learning_area):
         
         print(f"Successfully imported module to {target_path}")
         return True
-        
+    
     except json.JSONDecodeError:
         print(f"Error: {file_path} is not a valid JSON file")
         return False
@@ -75,6 +83,35 @@ def import_module(file_path, learning_area):
         print(f"Error importing module: {e}")
         return False
 
+def compile_bundle(bundle_path=DEFAULT_BUNDLE_PATH, hide_answers=None):
+    """Compile every module under ./content/modules into a single mmap-able bundle"""
+    from app.core.config import settings
+    from app.models.learning import LearningContent, summarize_module
+    from app.services.content_bundle import write_bundle
+    
+    if hide_answers is None:
+        hide_answers = settings.QUIZ_HIDE_ANSWERS
+    content = LearningContent(Path("./content/modules"), hide_answers=hide_answers)
+    content.load_all()
+    if content.errors:
+        for module_file, error in content.errors.items():
+            print(f"Error: {module_file}: {error}")
+        print("Content bundle not written; fix the invalid modules above first")
+        return False
+    areas = {area: content.get_modules_for_area(area) for area in content.get_areas()}
+    answer_keys = {area: content.get_snapshot(area).answer_keys for area in areas}
+    
+    try:
+        counts = write_bundle(areas, Path(bundle_path), summarize_module, answer_keys, hide_answers)
+    except Exception as e:
+        print(f"Error compiling content bundle: {e}")
+        return False
+    
+    for area, count in counts.items():
+        print(f"  {area}: {count} modules")
+    print(f"Successfully compiled content bundle to {bundle_path}" + (" (quiz answers hidden)" if hide_answers else ""))
+    return True
+
 def main():
     parser = argparse.ArgumentParser(description="Import content modules into Virtual Tech Box")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
@@ -88,12 +125,22 @@ def main():
     import_parser.add_argument("file", help="Path to module JSON file")
     import_parser.add_argument("area", help="Learning area ID (e.g. devops, fullstack)")
     
+    # compile command
+    compile_parser = subparsers.add_parser("compile", help="Compile all modules into a content bundle")
+    compile_parser.add_argument("--output", default=str(DEFAULT_BUNDLE_PATH), help="Bundle file to write")
+    compile_parser.add_argument("--hide-answers", action="store_true", default=None,
+                                help="Leave quiz answers out of the served modules (default: QUIZ_HIDE_ANSWERS)")
+    
     args = parser.parse_args()
     
     if args.command == "create":
         create_module_structure(args.area)
     elif args.command == "import":
-        import_module(args.file, args.area)
+        # Keep an existing bundle in sync so running workers pick up the new module
+        if import_module(args.file, args.area) and DEFAULT_BUNDLE_PATH.exists():
+            compile_bundle()
+    elif args.command == "compile":
+        compile_bundle(args.output, args.hide_answers)
     else:
         parser.print_help()
 
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# backend/scripts/load_test.py
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Allow running as `python scripts/load_test.py` from the backend root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx
+from fake_hubspot import add_fake_arguments, create_fake_hubspot, fake_from_arguments
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def serve_fake(args) -> Tuple[object, threading.Thread]:
+    """Start the fake HubSpot server in a background thread"""
+    import uvicorn
+    
+    fake = fake_from_arguments(args)
+    server = uvicorn.Server(uvicorn.Config(
+        create_fake_hubspot(fake), host="127.0.0.1", port=args.fake_port, log_level="warning"
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+def build_workload(args) -> List[Tuple[str, str]]:
+    """Mix of (operation, email) pairs: new registrations, repeated ones and email checks"""
+    run_id = uuid.uuid4().hex[:8]
+    registered: List[str] = []
+    operations = []
+    for i in range(args.requests):
+        roll = random.random()
+        if roll < args.check_ratio:
+            if registered and random.random() < 0.5:
+                operations.append(("check-email", random.choice(registered)))
+            else:
+                operations.append(("check-email", f"unknown-{run_id}-{i}@example.com"))
+        elif registered and roll < args.check_ratio + args.duplicate_ratio:
+            operations.append(("register", random.choice(registered)))
+        else:
+            email = f"load-{run_id}-{i}@example.com"
+            registered.append(email)
+            operations.append(("register", email))
+    return operations
+
+async def send(client: httpx.AsyncClient, operation: str, email: str) -> int:
+    if operation == "register":
+        response = await client.post("/api/v1/users/register", json={
+            "name": "Load Tester",
+            "email": email,
+            "phoneNumber": "5551234567",
+            "learningArea": "devops",
+        })
+    else:
+        response = await client.get(f"/api/v1/users/check-email/{email}")
+    return response.status_code
+
+async def drive(client: httpx.AsyncClient, operations: List[Tuple[str, str]], concurrency: int):
+    """Run the workload with ``concurrency`` clients; returns per-operation latencies and statuses"""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    pending = iter(operations)
+    
+    async def worker():
+        for operation, email in pending:
+            start = time.perf_counter()
+            try:
+                status = await send(client, operation, email)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies[operation].append(time.perf_counter() - start)
+            statuses[operation][status] += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, statuses
+
+def report(elapsed: float, latencies, statuses, hubspot_stats: dict) -> dict:
+    total = sum(len(values) for values in latencies.values())
+    result = {
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput": round(total / elapsed, 1) if elapsed else 0.0,
+        "operations": {},
+        "hubspot": hubspot_stats,
+    }
+    for operation, values in sorted(latencies.items()):
+        values.sort()
+        result["operations"][operation] = {
+            "count": len(values),
+            "throughput": round(len(values) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+            "status": {str(status): count for status, count in statuses[operation].items()},
+        }
+    return result
+
+def print_report(result: dict) -> None:
+    print(f"{result['requests']} requests in {result['seconds']}s ({result['throughput']} req/s)")
+    print(f"{'operation':<12} {'count':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  status")
+    for operation, stats in result["operations"].items():
+        print(
+            f"{operation:<12} {stats['count']:>7} {stats['throughput']:>8} {stats['p50_ms']:>9} "
+            f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['max_ms']:>9}  {stats['status']}"
+        )
+    print(f"HubSpot: {result['hubspot']}")
+
+async def run(args) -> dict:
+    operations = build_workload(args)
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    
+    if args.target:
+        # An already running backend, started with HUBSPOT_BASE_URL pointing at the fake
+        async with httpx.AsyncClient(base_url=args.target, timeout=60) as client:
+            elapsed, latencies, statuses = await drive(client, operations, args.concurrency)
+    else:
+        from app.main import app
+        
+        logging.getLogger().setLevel(args.log_level.upper())
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=60) as client:
+                elapsed, latencies, statuses = await drive(client, operations, args.concurrency)
+        # Leaving the lifespan drains the registration queue into the fake
+    
+    async with httpx.AsyncClient(base_url=fake_url) as client:
+        hubspot_stats = (await client.get("/__stats")).json()
+    return report(elapsed, latencies, statuses, hubspot_stats)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test registration and email checks against a fake HubSpot")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--check-ratio", type=float, default=0.5, help="Fraction of requests that are email checks")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05,
+                        help="Fraction of requests that re-register an email already used")
+    parser.add_argument("--target", help="Base URL of a running backend (default: drive the app in-process)")
+    parser.add_argument("--fake-port", type=int, default=8765, help="Port of the fake HubSpot server")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for a repeatable workload")
+    parser.add_argument("--log-level", default="error", help="Log level of the in-process backend")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    
+    server, thread = serve_fake(args)
+    data_dir = None
+    if not args.target:
+        # Settings are read at import time, so configure the app before importing it
+        data_dir = tempfile.mkdtemp(prefix="vtb-load-")
+        os.environ.update({
+            "HUBSPOT_API_KEY": "fake",
+            "HUBSPOT_BASE_URL": f"http://127.0.0.1:{args.fake_port}",
+            "REGISTRATION_QUEUE_PATH": os.path.join(data_dir, "registration_queue.db"),
+            "LOCAL_USERS_PATH": os.path.join(data_dir, "local_users.db"),
+            "LOCAL_USERS_IMPORT_PATH": os.path.join(data_dir, "local_users.json"),
+            "EMAIL_FILTER_PATH": os.path.join(data_dir, "email_filter.db"),
+            "IDEMPOTENCY_PATH": os.path.join(data_dir, "idempotency.db"),
+            "PROGRESS_DB_PATH": os.path.join(data_dir, "progress.db"),
+            "METRICS_DB_PATH": os.path.join(data_dir, "metrics.db"),
+            "PROFILE_DIR": os.path.join(data_dir, "profiles"),
+        })
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        server.should_exit = True
+        thread.join()
+        if data_dir is not None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
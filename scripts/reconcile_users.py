@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# backend/scripts/reconcile_users.py
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Allow running as `python scripts/reconcile_users.py` from the backend root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+from app.db.local_users import LocalUserStore
+from app.services.hubspot_client import create_async_client
+from app.services.reconciler import CHECKPOINT, LocalUserReconciler
+
+async def reconcile(store, concurrency):
+    client = create_async_client()
+    if client is None:
+        print("HUBSPOT_API_KEY is not set; nothing to reconcile against")
+        return 1
+    
+    reconciler = LocalUserReconciler(store, client, concurrency=concurrency)
+    if not store.acquire_lease(CHECKPOINT, reconciler.owner, reconciler.lease_ttl):
+        print("Another process is reconciling local users; try again later")
+        await client.aclose()
+        return 1
+    try:
+        stats = await reconciler.run_once()
+    finally:
+        store.release_lease(CHECKPOINT, reconciler.owner)
+        await client.aclose()
+    print(f"Checked {stats['checked']} users: {stats['existing']} already in HubSpot, "
+          f"{stats['created']} created, {stats['failed']} failed")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync users stored locally during a HubSpot outage into HubSpot")
+    parser.add_argument("--db", default=str(settings.LOCAL_USERS_PATH), help="Local user store")
+    parser.add_argument("--concurrency", type=int, default=settings.LOCAL_USERS_RECONCILE_CONCURRENCY,
+                        help="Batches of 100 contacts in flight")
+    parser.add_argument("--status", action="store_true", help="Only show how many users are waiting")
+    parser.add_argument("--reset", action="store_true", help="Start again from the first stored user")
+    args = parser.parse_args()
+    
+    store = LocalUserStore(Path(args.db))
+    if args.reset:
+        store.set_checkpoint(CHECKPOINT, 0)
+    if args.status:
+        print(f"{store.count_after(store.get_checkpoint(CHECKPOINT))} local users waiting to be reconciled")
+        return
+    sys.exit(asyncio.run(reconcile(store, args.concurrency)))
+
+if __name__ == "__main__":
+    main()